@@ -2,3 +2,5 @@ from .utils.functools import just, call, swap, unpack_args, throw, unidec, \
     pluck, factual, pick, omit, truthful, avg, random_str
 from .utils.translation import _
 from .utils.urls import view_url, admin_urls, package_patterns
+
+default_app_config = 'era.config.EraConfig'
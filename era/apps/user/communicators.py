@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.mail import send_mail
 from django.utils.text import capfirst
+from ...components import render_many
 
 
 class Communicator:
@@ -13,12 +14,16 @@ class Communicator:
         raise NotImplementedError
 
     def send(self, request, subject, component, **props):
-        self.request = request
-        return self.communicate(
+        return self.deliver(
+            request,
             subject,
             component().as_string(request, **dict(
                 {'user': self.user, 'subject': subject}, **props)))
 
+    def deliver(self, request, subject, text):
+        self.request = request
+        return self.communicate(subject, text)
+
 
 class EmailCommunicator(Communicator):
     def get_from(self):
@@ -38,6 +43,16 @@ class EmailCommunicator(Communicator):
                 **self.get_connection()))
 
 
+def broadcast(request, users, subject, component, **props):
+    users = list(users)
+    return list(map(
+        lambda user, text: user.comm.deliver(request, subject, text),
+        users,
+        render_many(component, map(
+            lambda user: dict({'user': user, 'subject': subject}, **props),
+            users), request)))
+
+
 class CommunicationMixin:
     @property
     def comm(self):
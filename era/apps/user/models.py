@@ -21,7 +21,7 @@ class Confirm(models.Model):
         while generate:
             code = random_str()
             encoded = hasher.encode(code, salt or hasher.salt())
-            generate = bool(cls.objects.filter(code=encoded).count())
+            generate = cls.objects.filter(code=encoded).exists()
         return code, encoded
 
 
@@ -45,7 +45,7 @@ class LoginView(AnonymousMixin, UserMixin, LoginMixin, WelcomeMixin, FormView):
     def process_valid(self, form, **kw):
         user = auth.authenticate(**form.cleaned_data)
         if user:
-            if Confirm.objects.filter(user=user, key='registration').count():
+            if Confirm.objects.filter(user=user, key='registration').exists():
                 self.send_message('error', _('sorry, unconfirmed data'))
             else:
                 return self.process_login(user)
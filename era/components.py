@@ -1,8 +1,9 @@
-from .templatetags.library import register, Component, TemplateComponent, Tag, ScriptedTag
+from .templatetags.library import register, render_many, Component, TemplateComponent, \
+    Tag, ScriptedTag, Cached
 from .templatetags.markup import Icon, MarkedList, IconicList, Break, ProgressBar, \
     Row, Container, Column, Link, Button, Label, Alert, Well, Caption, Panel, Accordion, \
     Navbar, Table
 from era.templatetags.media import Script, Stylesheet, Image, Messages
 from .templatetags.menu import Menu, Dropdown
 from .templatetags.forms import Form
-from .templatetags.lists import Paginator, ChangeList, SearchLine
+from .templatetags.lists import Paginator, CursorPaginator, ChangeList, SearchLine
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class EraConfig(AppConfig):
+    name = 'era'
+
+    def ready(self):
+        from .models import connect_models
+        connect_models()
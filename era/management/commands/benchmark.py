@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...utils import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Render representative component trees and report time, peak memory and live blocks per op.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*')
+        parser.add_argument('--number', dest='number', type=int, default=10)
+        parser.add_argument('--repeat', dest='repeat', type=int, default=3)
+        parser.add_argument('--baseline', dest='baseline', default=benchmarks.BASELINE)
+        parser.add_argument('--tolerance', dest='tolerance', type=float, default=0.2)
+        parser.add_argument('--save', dest='save', action='store_true', default=False)
+
+    def handle(self, *args, **kw):
+        unknown = set(kw['names']) - set(benchmarks.registry)
+        if unknown:
+            raise CommandError('unknown benchmarks: {0}'.format(', '.join(sorted(unknown))))
+        results = benchmarks.run(kw['names'], number=kw['number'], repeat=kw['repeat'])
+        baseline = benchmarks.load_baseline(kw['baseline'])
+        for name, result in results.items():
+            self.stdout.write('{0:<12} {1:>10.3f} ms/op {2:>10} KiB peak {3:>8} blocks{4}'.format(
+                name, result['time_ms'],
+                '-' if result['peak_kb'] is None else '{0:.1f}'.format(result['peak_kb']),
+                '-' if result['blocks'] is None else result['blocks'],
+                '' if not name in baseline else ' ({0:+.1%})'.format(
+                    result['time_ms'] / baseline[name]['time_ms'] - 1)))
+        if kw['save']:
+            benchmarks.save_baseline(dict(baseline, **results), kw['baseline'])
+        regressions = benchmarks.compare(results, baseline, kw['tolerance'])
+        if regressions and not kw['save']:
+            raise CommandError('regressions: {0}'.format(', '.join(regressions)))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from ...utils.search import get_indexes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 shadow tables declared in ERA_SEARCH_INDEXES.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', dest='database', default=None)
+
+    def handle(self, *args, **kw):
+        for model, engine in get_indexes().items():
+            engine.create_index(rebuild=True, using=kw['database'])
+            self.stdout.write('{0}: {1}'.format(model._meta.db_table, engine.get_table()))
@@ -0,0 +1,51 @@
+import logging
+from random import random
+from django.conf import settings
+from .utils.profiling import start_profile, stop_profile
+from .utils.queries import start_tracing, stop_tracing
+
+logger = logging.getLogger('era.profile')
+
+
+class RenderProfileMiddleware:
+    def get_rate(self, request):
+        return getattr(settings, 'ERA_PROFILE_RATE', 1.0 if settings.DEBUG else 0)
+
+    def process_request(self, request):
+        stop_profile()
+        if random() < self.get_rate(request):
+            start_profile()
+
+    def process_exception(self, request, exception):
+        stop_profile()
+
+    def process_response(self, request, response):
+        profile = stop_profile()
+        if profile and profile.stats:
+            logger.info('%s %s\n%s', request.method, request.path, profile.as_text())
+            response['Server-Timing'] = profile.as_header()
+        return response
+
+
+class QueryPatternMiddleware:
+    def get_rate(self, request):
+        return getattr(settings, 'ERA_QUERY_TRACE_RATE', 1.0 if settings.DEBUG else 0)
+
+    def get_threshold(self, request):
+        return getattr(settings, 'ERA_QUERY_TRACE_THRESHOLD', 3)
+
+    def process_request(self, request):
+        stop_tracing()
+        if random() < self.get_rate(request):
+            start_tracing()
+
+    def process_exception(self, request, exception):
+        stop_tracing()
+
+    def process_response(self, request, response):
+        trace = stop_tracing()
+        if trace and trace.get_repeated(self.get_threshold(request)):
+            logging.getLogger('era.queries').warning(
+                'repeated queries in %s %s\n%s',
+                request.method, request.path, trace.as_text(self.get_threshold(request)))
+        return response
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, post_delete
+from .utils.cache import touch_model, touch_pending
+from .utils.search import update_index
+
+
+def invalidate_fragments(sender, **kw):
+    touch_model(sender, kw.get('using'))
+
+
+def index_instance(sender, instance, **kw):
+    update_index(sender, instance, using=kw.get('using'))
+
+
+def unindex_instance(sender, instance, **kw):
+    update_index(sender, instance, delete=True, using=kw.get('using'))
+
+
+def connect_models():
+    for label in getattr(settings, 'ERA_CACHED_MODELS', []):
+        post_save.connect(invalidate_fragments, sender=apps.get_model(label))
+        post_delete.connect(invalidate_fragments, sender=apps.get_model(label))
+    for label in getattr(settings, 'ERA_SEARCH_INDEXES', {}):
+        post_save.connect(index_instance, sender=apps.get_model(label))
+        post_delete.connect(unindex_instance, sender=apps.get_model(label))
+    request_finished.connect(touch_pending)
@@ -16,6 +16,15 @@ CODENAME = os.path.basename(os.path.abspath(BASE_DIR))
 INDEX_VIEW = 'app.views.IndexView'
 MODULES = ['app']
 ERA_COLLECTIONS = {'reference': just}
+ERA_RENDER_CACHE_SIZE = 1024
+ERA_FRAGMENT_CACHE = 'default'
+ERA_FRAGMENT_TIMEOUT = 300
+ERA_CACHED_MODELS = []
+ERA_COMPILE_TAGS = False
+ERA_COUNT_TIMEOUT = 60
+ERA_SEARCH_CONFIG = 'simple'
+ERA_SEARCH_INDEXES = {}
+ERA_PARALLEL_WORKERS = 4
 
 USE_I18N = True
 LOCALE_PATHS = (
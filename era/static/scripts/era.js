@@ -6,16 +6,47 @@ function Form(cls, props) {
     }
 }
 
+function loadFragment(url, push) {
+    $.get(url, function (html) {
+        if (push) {
+            history.pushState({fragment: true}, '', url);
+        }
+        $('main').replaceWith(html);
+    })
+}
+
 function SearchLine(cls, props) {
-    $(cls).val($.query.get('search'));
+    $(cls).val($.query.load(window.location.href).get('search'));
     $(cls).keypress(function (e) {
         if (e.which == 13) {
             var value = $(this).val();
-            if (value) {
-                window.location.search = $.query.set("search", value);
-            } else {
-                window.location.search = $.query.REMOVE("search");
-            }
+            var query = $.query.load(window.location.href).REMOVE('page').REMOVE('cursor');
+            loadFragment(window.location.pathname + (
+                value ? query.set('search', value) : query.REMOVE('search')), true);
         }
     })
 }
+
+$(function () {
+    $(document).on('change', 'form.bulk .bulk-toggle', function () {
+        $(this).closest('form').find('.bulk-pk').prop('checked', this.checked);
+    });
+    $(document).on('submit', 'form.bulk', function (e) {
+        var action = $(document.activeElement);
+        if (action.val() == 'delete' && !confirm(action.text().trim() + '?')) {
+            e.preventDefault();
+        }
+    });
+    if ($('main .list-qs').length) {
+        history.replaceState({fragment: true}, '');
+        $(document).on('click', 'main a.qs-key', function (e) {
+            e.preventDefault();
+            loadFragment(this.href, true);
+        });
+        $(window).on('popstate', function (e) {
+            if (e.originalEvent.state && e.originalEvent.state.fragment) {
+                loadFragment(window.location.href, false);
+            }
+        });
+    }
+})
@@ -167,8 +167,8 @@ class Formset(Table, FieldsetMixin):
 class Action(Tag):
     def get_button_props(self):
         if not pick(self.props, 'link', 'onclick'):
-            return dict({'type': 'submit'}, **pick(self.props, 'level'))
-        return pick(self.props, 'level', 'onclick')
+            return dict({'type': 'submit'}, **pick(self.props, 'level', 'attrs'))
+        return pick(self.props, 'level', 'onclick', 'attrs')
 
     def get_link_props(self):
         if isinstance(self.props.link, str):
@@ -1,20 +1,35 @@
+from collections import ChainMap
+from collections.abc import Iterator
+from copy import copy
+from hashlib import md5
 from importlib import import_module
 from itertools import chain
+from types import CodeType, MappingProxyType
+import builtins
 import json
 import re
 
 from classytags.arguments import MultiKeywordArgument
 from classytags.core import Options
-from classytags.core import Tag as ClassyTag
-from django.template import Library, TemplateSyntaxError
+from classytags.core import Tag as ClassyTag, TagMeta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.template import Context, Library, TemplateSyntaxError
+from django.template.context import BaseContext
 from django.template.loader import render_to_string
+from django.utils.functional import Promise
+from django.utils.translation import get_language
 
+from ..utils.cache import LRUCache, get_fragment_cache, get_model_label, get_versions
 from ..utils.functools import call, unpack_args, filter_dict, reduce_dict, map_values, \
-    truthful, factual, pick, omit, factual
+    truthful, factual, first, pick, omit, freeze
+from ..utils.profiling import get_profile
 from ..utils.translation import normalize
 from ..utils.urls import resolve, get_site_url
 
 register = Library()
+STREAM_MARKER = '<!-- era:stream -->'
 register.era = lambda cls: register.tag(normalize(cls.__name__), cls)
 
 
@@ -34,62 +49,146 @@ class Import(ClassyTag):
         return ''
 
 
-class HTMLTag:
-    def __init__(self, el):
-        self.el = str(el)
+def render_attrs(attrs):
+    return ''.join(reduce_dict(
+        lambda k, v: ' ' + (k if v is None or v is False else '{0}="{1}"'.format(k, v)),
+        attrs))
 
-    def __str__(self):
-        return self.el
 
-    def modify_tag(self, diff):
-        tag, *rest = self.el.split('>')
-        self.el = '>'.join([diff(tag)] + rest)
+class Node:
+    tag_pattern = re.compile(
+        r'^<([\w-]+)((?:[^>"\']|"[^"]*"|\'[^\']*\')*?)\s*(/?)>', re.S)
+    attr_pattern = re.compile(
+        r'([^\s=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\']+)))?')
 
-    def modify_content(self, content, fmt):
-        self.el = re.sub(r'>(.*)<', fmt.format(content), self.el)
+    def __init__(self, el=None, attrs=None, children=None, nobody=False):
+        self.el = el
+        self.attrs = dict(attrs or {})
+        self.children = list(children) if isinstance(children, list) else \
+            [] if children in (None, '') else [children]
+        self.nobody = nobody
+        self.slash = nobody
+        self.head = []
+        self.tail = []
+
+    @classmethod
+    def parse(cls, markup):
+        markup = str(markup)
+        match = cls.tag_pattern.match(markup)
+        if not match:
+            return cls(children=markup)
+        el, attrs, slash = match.groups()
+        rest = markup[match.end():]
+        node = cls(el, map(
+            lambda m: (m.group(1), next(filter(lambda v: v is not None, m.groups()[1:]), None)),
+            cls.attr_pattern.finditer(attrs)))
+        closing = '</{0}>'.format(el)
+        if not slash and rest.endswith(closing):
+            node.children = factual([rest[:-len(closing)]])
+        else:
+            node.nobody = True
+            node.slash = bool(slash)
+            node.tail = factual([rest])
+        return node
+
+    def __str__(self):
+        return ''.join(self.stream())
+
+    def render_attrs(self):
+        return render_attrs(self.attrs)
+
+    def stream(self):
+        for chunk in self.stream_content(self.head):
+            yield chunk
+        if self.el:
+            yield '<{0}{1}{2}>'.format(
+                self.el, self.render_attrs(), self.slash and ' /' or '')
+        if not (self.el and self.nobody):
+            for chunk in self.stream_content(self.children):
+                yield chunk
+            if self.el:
+                yield '</{0}>'.format(self.el)
+        for chunk in self.stream_content(self.tail):
+            yield chunk
+
+    @classmethod
+    def stream_content(cls, content):
+        for item in content:
+            if isinstance(item, Node):
+                for chunk in item.stream():
+                    yield chunk
+            elif isinstance(item, (list, tuple, Iterator)):
+                for chunk in cls.stream_content(item):
+                    yield chunk
+            else:
+                yield str(item)
 
     def after(self, content):
-        self.el += content
+        self.tail.append(content)
 
     def before(self, content):
-        self.el = content + self.el
+        self.head.insert(0, content)
 
     def append(self, content):
-        self.modify_content(content, r'>\g<1>{0}<')
+        self.children.append(content)
 
     def prepend(self, content):
-        self.modify_content(content, r'>{0}\g<1><')
+        self.children.insert(0, content)
 
     def add_attr(self, name, val=None):
-        self.modify_tag(lambda tag: ' '.join([
-            tag.endswith('/') and tag.rstrip('/') or tag,
-            val is None and name or '{0}="{1}"'.format(name, val),
-            tag.endswith('/') and '/' or '']))
+        self.attrs[name] = val
 
     def add_class(self, *cls):
         if not any(cls):
             return
-        if not self.has_attr('class'):
-            self.add_attr('class', ' '.join(cls))
-        else:
-            self.modify_tag(
-                lambda tag: re.sub(
-                    r'class="([^"]*)"',
-                    r'class="\g<1> {0}"'.format(' '.join(cls)),
-                    tag))
+        self.attrs['class'] = ' '.join(factual(chain([self.attrs.get('class')], cls)))
 
     def has_attr(self, name):
-        return name in self.el.split('>')[0]
+        return name in self.attrs
 
     def empty(self):
-        self.el = ''
+        self.el = None
+        self.attrs = {}
+        self.children = []
+        self.head = []
+        self.tail = []
 
 
-class Props(dict):
+def get_code_names(code):
+    return set(chain(code.co_names, *map(
+        get_code_names,
+        filter(lambda c: isinstance(c, CodeType), code.co_consts))))
+
+
+def get_owner(cls, name):
+    return first(filter(lambda c: name in c.__dict__, cls.__mro__))
+
+
+def check_static(cls, method, *allow):
+    names = set(chain(dir(builtins), [method], allow))
+    return all(map(
+        lambda fn: get_code_names(fn.__code__) <= names,
+        factual(map(lambda c: c.__dict__.get(method), cls.__mro__))))
+
+
+class Props(ChainMap):
     def __getattr__(self, name):
-        if name in self:
-            return self.get(name)
-        raise AttributeError('Missing prop: ' + name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError('Missing prop: ' + name)
+
+    def detach(self, key):
+        if any(map(lambda m: key in m, self.maps[1:])):
+            self.maps = [dict(self)]
+
+    def __delitem__(self, key):
+        self.detach(key)
+        super().__delitem__(key)
+
+    def pop(self, key, *args):
+        self.detach(key)
+        return super().pop(key, *args)
 
 
 class RequestUrlMixin:
@@ -100,13 +199,41 @@ class RequestUrlMixin:
         return get_site_url(self.request, *args, **kw)
 
 
-class Component(RequestUrlMixin, ClassyTag):
+def freeze_prop(value):
+    if isinstance(value, (Node, Promise)):
+        return str(value)
+    elif value is None or isinstance(value, (str, int, float, type)):
+        return value
+    raise TypeError('can not use {0} in a cache key'.format(type(value).__name__))
+
+
+class ComponentMeta(TagMeta):
+    def __call__(cls, *args, **kw):
+        if not '_prepared' in cls.__dict__:
+            cls.prepare(cls.__new__(cls))
+            cls._prepared = True
+        return super().__call__(*args, **kw)
+
+
+class Component(RequestUrlMixin, ClassyTag, metaclass=ComponentMeta):
+    pure = False
+    owner = None
+    tainted = False
+    render_cache = LRUCache(getattr(settings, 'ERA_RENDER_CACHE_SIZE', 1024))
+
     def __init__(self, parser=None, tokens=None, context=None):
         self.set_context(context or {})
         self.blocks = {}
-        self.set_options()
         parser and super().__init__(parser, tokens)
 
+    @classmethod
+    def prepare(cls, obj):
+        obj.set_context({})
+        obj.set_options()
+        cls.options = obj.options
+        cls.class_defaults = MappingProxyType(obj.get_defaults()) \
+            if check_static(cls, 'get_defaults') else None
+
     @classmethod
     def as_string(cls, request=None, **kw):
         # TODO: move to view.show
@@ -120,6 +247,7 @@ class Component(RequestUrlMixin, ClassyTag):
 
     def insert(self, cls, props=None, nodelist=None, **kw):
         obj = cls(context=self.context)
+        obj.owner = self
         if nodelist is not None:
             kw['nodelist'] = nodelist
         obj.set_props(props, **kw)
@@ -128,6 +256,9 @@ class Component(RequestUrlMixin, ClassyTag):
     def show(self, cls, props=None, nodelist=None, **kw):
         return self.insert(cls, props, nodelist, **kw).render_dom()
 
+    def show_many(self, cls, props):
+        return map(lambda p: self.show(cls, p), props)
+
     def render_tag(self, context=None, mka=None, **kw):
         if not self.context and context:
             self.set_context(context)
@@ -153,24 +284,77 @@ class Component(RequestUrlMixin, ClassyTag):
     def resolve_props(self):
         return {}
 
+    @property
+    def request(self):
+        self.taint()
+        return self._request
+
+    def taint(self):
+        if not self.tainted:
+            self.tainted = True
+            self.owner and self.owner.taint()
+
+    @property
+    def streaming(self):
+        return 'stream' in self.context
+
     def set_context(self, context):
         self.context = context
-        self.request = self.context.get('request')
+        self._request = self.context.get('request')
 
     def set_options(self, **kw):
         self.options = Options(MultiKeywordArgument('mka', required=False), **kw)
 
     def set_props(self, d, **kw):
         self.props = Props(
-            self.get_defaults(),
-            **dict(d or {}, **kw))
+            dict(d or {}, **kw),
+            self.get_defaults() if self.class_defaults is None else self.class_defaults)
         self.props.update(self.resolve_props())
 
-    def render_dom(self):
+    def render_node(self):
         self.tune()
-        self.dom = HTMLTag(self.DOM())
+        self.dom = self.DOM()
+        if not isinstance(self.dom, Node):
+            self.dom = Node.parse(self.dom)
         self.tweak()
-        return str(self.dom)
+        return self.dom
+
+    def check_pure(self):
+        return self.__class__.__dict__.get('pure', False)
+
+    def get_cache_key(self):
+        try:
+            key = (self.__class__, get_language(), freeze(self.props, freeze_prop))
+            hash(key)
+            return key
+        except TypeError:
+            return None
+
+    def render_string(self):
+        key = self.check_pure() and not self.tainted and self.get_cache_key()
+        if not key:
+            return self.render_markup()
+        result = self.render_cache.get(key)
+        if result is None:
+            result = self.render_markup()
+            if not self.tainted:
+                self.render_cache.set(key, result)
+        return result
+
+    def render_markup(self):
+        return str(self.render_node())
+
+    def render_dom(self):
+        profile = get_profile()
+        if profile is None:
+            return self.render_string()
+        result = None
+        profile.enter()
+        try:
+            result = self.render_string()
+            return result
+        finally:
+            profile.leave(self.__class__, result)
 
     def DOM(self):
         raise NotImplementedError
@@ -183,6 +367,23 @@ class Component(RequestUrlMixin, ClassyTag):
             self.dom.add_class(self.props['class'])
 
 
+def render_many(cls, props, request=None, context=None, owner=None):
+    if not isinstance(context, BaseContext):
+        context = Context(context or {'request': request})
+    for p in props:
+        depth = len(context.dicts)
+        context.push()
+        try:
+            obj = cls(context=context)
+            obj.owner = owner
+            obj.set_props(p)
+            result = obj.render_dom()
+        finally:
+            # components may update the context with layers of their own
+            del context.dicts[depth:]
+        yield result
+
+
 class ComplexComponent(Component):
     parts = []
 
@@ -203,9 +404,9 @@ class ComplexComponent(Component):
 class TemplateComponent(Component):
     template = 'index.html'
 
-    def render_dom(self):
+    def render_node(self):
         self.context.update(self.props)
-        return render_to_string(self.template, self.context)
+        return Node(children=render_to_string(self.template, self.context))
 
 
 @register.era
@@ -225,13 +426,77 @@ class Tag(ComplexComponent):
     def resolve_attrs(self):
         return {}
 
-    def resolve_node_name(self):
+    @classmethod
+    def prepare(cls, obj):
+        super().prepare(obj)
+        cls.node_name = obj.get_node_name()
+        cls.compiled = getattr(settings, 'ERA_COMPILE_TAGS', False) \
+            and cls.compile(obj) or None
+
+    @classmethod
+    def compile(cls, obj):
+        hooks = [
+            'DOM', 'tune', 'tweak', 'resolve_tag', 'render_node', 'render_markup',
+            'get_node_name', 'resolve_node_name']
+        if any(map(lambda name: get_owner(cls, name) is not get_owner(Tag, name), hooks)):
+            return None
+        namespace = {
+            'Node': Node,
+            'factual': factual,
+            'render_attrs': render_attrs,
+            'EL': cls.el,
+            'NAME': cls.named and cls.node_name or ''}
+        code = ['def render(self):', '    props = self.props', "    el = props.get('el', EL)"]
+        resolve = [
+            "    name = ' '.join(factual([NAME, attrs.get('class', ''), props.get('class', '')]))",
+            "    if props.get('id'):",
+            "        attrs['id'] = props.get('id')",
+            '    if name:',
+            "        attrs['class'] = name",
+            "    opening = '<' + el + render_attrs(attrs)"]
+        if check_static(cls, 'resolve_attrs'):
+            constant = obj.resolve_attrs()
+            namespace['CONSTANT'] = constant
+            namespace['ATTRS'] = dict(constant, **truthful({'class': ' '.join(
+                factual([namespace['NAME'], constant.get('class', '')]))}))
+            namespace['OPENING'] = render_attrs(namespace['ATTRS'])
+            code += [
+                "    if not ('attrs' in props or 'id' in props or 'class' in props):",
+                '        attrs = ATTRS',
+                "        opening = '<' + el + OPENING",
+                '    else:',
+                "        attrs = dict(props.get('attrs', ()), **CONSTANT)"] + list(map(
+                    lambda line: '    ' + line, resolve))
+        else:
+            code += ["    attrs = dict(props.get('attrs', ()), **self.resolve_attrs())"] + resolve
+        if cls.nobody:
+            code += ["    return opening + ' />'"]
+        else:
+            if get_owner(cls, 'get_nodelist') is Tag:
+                code += ['    nodelist = props.nodelist']
+            else:
+                code += [
+                    '    props.update(el=el, attrs=dict(attrs))',
+                    '    nodelist = self.get_nodelist()']
+            code += [
+                '    if nodelist is None:',
+                "        nodelist = ''",
+                '    elif not isinstance(nodelist, str):',
+                "        nodelist = ''.join(Node.stream_content([nodelist]))",
+                "    return ''.join([opening, '>', nodelist, '</', el, '>'])"]
+        exec('\n'.join(code), namespace)
+        return namespace['render']
+
+    def get_node_name(self):
         return ' '.join(map(
             lambda cls: normalize(cls.__name__),
             filter(
                 lambda cls: getattr(cls, 'named', False),
                 self.__class__.__mro__[:self.__class__.__mro__.index(self.root)])))
 
+    def resolve_node_name(self):
+        return self.node_name
+
     def resolve_tag(self):
         attrs = dict(
             self.props.get('attrs', {}),
@@ -245,19 +510,18 @@ class Tag(ComplexComponent):
                 self.props.get('class', '')]))}))
         return {
             'el': self.props.get('el', getattr(self, 'el')),
-            'attrs': ' '.join(reduce_dict(
-                lambda k, v: v and '{0}="{1}"'.format(k, v) or k,
-                attrs))}
+            'attrs': attrs}
 
     def set_options(self, **kw):
         return super().set_options(**dict(kw, **(
             (self.inline or self.nobody) and {'blocks': []} or {})))
 
     def DOM(self):
-        return ''.join([
-            '<{el} {attrs}',
-            '/>' if self.nobody else '>{nodelist}</{el}>']) \
-        .format(**self.props)
+        return Node(
+            self.props.el,
+            self.props.attrs,
+            None if self.nobody else self.props.nodelist,
+            nobody=self.nobody)
 
     def tune(self):
         self.props.update(self.resolve_tag())
@@ -266,6 +530,11 @@ class Tag(ComplexComponent):
     def tweak(self):
         pass
 
+    def render_markup(self):
+        if self.compiled and not self.streaming:
+            return self.compiled(self)
+        return super().render_markup()
+
 
 class ScriptedTag(Tag):
     @property
@@ -281,15 +550,16 @@ class ScriptedTag(Tag):
         return {}
 
     def DOM(self):
-        return ''.join(factual([
-            super().DOM(),
-            self.get_script() is not None and self.inject(
+        dom = super().DOM()
+        if self.get_script() is not None:
+            dom.after(self.inject(
                 Tag, {'el': 'script'}, '$(function() {{{0}}})'.format(
                     ''.join([
                         self.get_script(),
                         '({0})'.format(', '.join([
                             '\'.{0}\''.format(self.resolve_node_name().split(' ')[-1]),
-                            json.dumps(self.resolve_script())]))])))]))
+                            json.dumps(self.resolve_script())]))]))))
+        return dom
 
 
 @register.era
@@ -299,14 +569,109 @@ class Display(Component):
 
     def DOM(self):
         if self.props.cls:
-            return self.show(self.props.cls, omit(self.props, 'component', 'cls'))
+            return self.insert(
+                self.props.cls,
+                omit(self.props, 'component', 'cls')).render_node()
         return ''
 
 
+class FragmentEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, Model):
+            return [o._meta.app_label, o._meta.model_name, o.pk]
+        return super().default(o)
+
+
+@register.era
+class Cached(ComplexComponent):
+    def get_defaults(self):
+        return {
+            'nodelist': '',
+            'key': '',
+            'vary': [],
+            'models': [],
+            'timeout': getattr(settings, 'ERA_FRAGMENT_TIMEOUT', 300)}
+
+    def resolve_props(self):
+        return map_values(
+            lambda v: factual(v.split(',')) if isinstance(v, str) else v,
+            pick(self.props, 'vary', 'models'))
+
+    def render_tag(self, context=None, mka=None, **kw):
+        if not self.context and context:
+            self.set_context(context)
+        self.set_props(dict(mka, **kw))
+        return self.render_dom()
+
+    def resolve_vary(self, name):
+        return getattr(self, 'vary_' + name)()
+
+    def vary_user(self):
+        return self.request.user.pk
+
+    def vary_role(self):
+        return getattr(self.request.user, 'role', None)
+
+    def vary_language(self):
+        return get_language()
+
+    def vary_path(self):
+        return self.request.path
+
+    def vary_query(self):
+        return sorted(self.request.GET.lists())
+
+    def dump_props(self):
+        try:
+            return json.dumps(self.props.get('props'), sort_keys=True, cls=FragmentEncoder)
+        except TypeError:
+            if self.props.key:
+                return None
+            raise
+
+    def get_fragment_key(self):
+        return 'era:fragment:' + md5(json.dumps([
+            self.props.key,
+            'component' in self.props and [
+                '.'.join([self.props.component.__module__, self.props.component.__name__]),
+                self.dump_props()],
+            list(map(self.resolve_vary, self.props.vary)),
+            get_versions(*self.props.models)], sort_keys=True, default=str).encode()).hexdigest()
+
+    def render_fragment(self):
+        if 'component' in self.props:
+            return self.show(self.props.component, self.props.get('props'))
+        elif hasattr(self.props.nodelist, 'render'):
+            return self.props.nodelist.render(self.context)
+        return self.props.nodelist
+
+    def check_models(self):
+        missing = set(map(get_model_label, self.props.models)) - set(map(
+            get_model_label, getattr(settings, 'ERA_CACHED_MODELS', [])))
+        if missing:
+            raise TemplateSyntaxError('add {0} to ERA_CACHED_MODELS'.format(
+                ', '.join(sorted(missing))))
+
+    def DOM(self):
+        self.check_models()
+        cache = get_fragment_cache()
+        key = self.get_fragment_key()
+        result = cache.get(key)
+        if result is None:
+            result = self.render_fragment()
+            cache.set(key, result, self.props.timeout)
+        return result
+
+
 @register.era
 class Content(Tag):
     el = 'main'
     inline = True
 
     def get_nodelist(self):
+        if self.streaming:
+            obj = self.insert(Display, {'component': 'content'})
+            obj.set_context(copy(self.context))
+            self.context['stream'].append(obj)
+            return STREAM_MARKER
         return self.show(Display, {'component': 'content'})
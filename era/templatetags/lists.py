@@ -1,10 +1,11 @@
 from itertools import chain
 from django.conf import settings
 from django.core.urlresolvers import resolve
+from django.template.defaulttags import CsrfTokenNode
 
-from ..utils.functools import call, unpack_args, factual, just, pick, first
+from ..utils.functools import call, defer, unpack_args, factual, just, pick, first
 from ..utils.translation.string import _
-from .library import Component, Tag, ScriptedTag
+from .library import Node, Component, Tag, ScriptedTag
 from .markup import MarkedList, Break, Link, Icon, Caption, Column, Panel, Table
 from .forms import Action
 
@@ -15,15 +16,17 @@ class QuerySetKey(Link):
 
     def get_url(self):
         qd = self.request.GET.copy()
+        '_fragment' in qd and qd.pop('_fragment')
         if self.props.replace:
             for key in qd.copy().keys():
                 if key.startswith(self.props.method):
                     qd.pop(key)
+        clean = list(self.props.clean)
         if self.props.value is None:
-            self.props.clean.append(self.props.argument)
+            clean.append(self.props.argument)
         else:
             qd[self.props.argument] = self.props.value
-        for arg in self.props.clean:
+        for arg in clean:
             arg in qd and qd.pop(arg)
         return '?'.join([self.request.path, qd.urlencode()]).rstrip('?')
 
@@ -36,7 +39,7 @@ class QuerySetKey(Link):
         if (self.props.value is None and not self.props.argument in self.request.GET) \
         or str(self.props.value) == self.request.GET.get(self.props.argument):
             return {}
-        return super().resolve_attrs()
+        return dict(super().resolve_attrs(), **{'class': 'qs-key'})
 
     def DOM(self):
         if not self.props.attrs:
@@ -52,7 +55,7 @@ class QuerySetFilter(Panel):
             QuerySetKey, dict({
                 'method': 'filter',
                 'key': self.props.key,
-                'clean': ['page'],
+                'clean': ['page', 'cursor'],
                 'value': value,
                 'collapse': value is None}),
             ' '.join([
@@ -98,7 +101,7 @@ class SortableTable(Table):
             icon = 'angle-double-up'
         return self.inject(
             QuerySetKey,
-            {'method': method, 'key': key, 'value': value, 'replace': True},
+            {'method': method, 'key': key, 'value': value, 'replace': True, 'clean': ['cursor']},
             title if icon is None else self.inject(
                 Caption, {'title': title, 'icon': icon}))
 
@@ -112,15 +115,18 @@ class Paginator(MarkedList):
     def resolve_props(self):
         return {'page': self.context['page_obj'], 'class': 'pager'}
 
+    def get_arrow_props(self, control):
+        return {
+            'method': 'page',
+            'key': '',
+            'value': call(getattr(self.props.page, control + '_page_number'))}
+
     def render_arrow(self, control, direction):
         if not call(getattr(self.props.page, 'has_' + control)):
             return ''
         return self.inject(
             QuerySetKey,
-            {
-                'method': 'page',
-                'key': '',
-                'value': call(getattr(self.props.page, control + '_page_number'))},
+            self.get_arrow_props(control),
             self.inject(Icon, {'name': 'angle-double-' + direction}))
 
     def get_items(self):
@@ -133,6 +139,45 @@ class Paginator(MarkedList):
             self.render_arrow('next', 'right')]
 
 
+class CursorPaginator(Paginator):
+    def get_arrow_props(self, control):
+        return {
+            'method': 'cursor',
+            'key': '',
+            'value': getattr(self.props.page, control + '_cursor'),
+            'clean': ['page']}
+
+    def get_items(self):
+        return [
+            self.render_arrow('previous', 'left'),
+            self.render_arrow('next', 'right')]
+
+
+class Checkbox(Tag):
+    el = 'input'
+    nobody = True
+    named = False
+
+    def resolve_attrs(self):
+        return dict({'type': 'checkbox'}, **pick(self.props, 'name', 'value'))
+
+
+class BulkPanel(Component):
+    def get_defaults(self):
+        return {'actions': [], 'count': None}
+
+    def render_select_all(self):
+        return self.inject(Tag, {'el': 'label', 'class': 'bulk-all'}, ' '.join(factual([
+            self.inject(Checkbox, {'name': 'all', 'value': 1}),
+            str(_('select all matching')),
+            self.props.count is not None and '({0})'.format(self.props.count)])))
+
+    def DOM(self):
+        return self.inject(Tag, {'el': 'div', 'class': 'bulk-actions'}, ''.join(chain(
+            [self.render_select_all()],
+            map(lambda action: self.inject(Action, action), self.props.actions))))
+
+
 class SearchLine(ScriptedTag):
     el = 'input'
     nobody = True
@@ -148,9 +193,15 @@ class ChangeList(Component):
     def get_location_qs(self):
         return {'next': self.request.get_full_path()}
 
+    def render_selection(self, obj):
+        if not self.props.get('bulk'):
+            return []
+        return [self.inject(Checkbox, {'name': 'pk', 'value': obj['pk'], 'class': 'bulk-pk'})]
+
     def render_objects(self):
-        return list(map(
+        return (just if self.streaming else list)(map(
             lambda obj: {'items': chain(
+                self.render_selection(obj),
                 [self.inject(
                     Link,
                     {'rel': str(obj['pk']), 'qs': self.get_location_qs()},
@@ -160,23 +211,56 @@ class ChangeList(Component):
                     list(map(first, self.props.guide))[1:]))},
             self.props.objects))
 
+    def get_thead(self):
+        return chain(
+            [(self.inject(Checkbox, {'class': 'bulk-toggle'}), False)] if self.props.get('bulk') else [],
+            map(lambda c: c[1:], self.props.guide))
+
     def render_table(self, component):
         return self.inject(
             component, {
-                'thead': map(lambda c: c[1:], self.props.guide),
+                'thead': self.get_thead(),
                 'tbody': self.render_objects()})
 
+    def render_bulk(self, table):
+        if not self.props.get('bulk'):
+            return table
+        paginator = self.context.get('paginator')
+        attrs = {'method': 'POST', 'action': self.request.get_full_path()}
+        content = [
+            CsrfTokenNode().render(self.context),
+            table,
+            self.inject(BulkPanel, {
+                'actions': self.props.bulk,
+                'count': paginator and paginator.count})]
+        if self.streaming:
+            return Node('form', dict(attrs, **{'class': 'bulk'}), content)
+        return self.inject(
+            Tag,
+            {'el': 'form', 'class': 'bulk', 'attrs': attrs},
+            ''.join(map(str, content)))
+
+    def get_paginator(self):
+        return Paginator if self.context['paginator'] else CursorPaginator
+
     def render_queryset(self):
-        table = self.render_table(SortableTable)
+        table = self.render_bulk(self.render_table(SortableTable))
         if self.context['is_paginated']:
-            return ''.join([table, self.inject(Paginator)])
+            return ''.join([table, self.inject(self.get_paginator())])
         return table
 
+    def stream_queryset(self):
+        yield self.render_bulk(self.insert(SortableTable, {
+            'thead': self.get_thead(),
+            'tbody': self.render_objects()}).render_node())
+        if self.context['is_paginated']:
+            yield self.inject(self.get_paginator())
+
     def render_actions(self):
         result = ''
         for action in self.props.actions:
-            action['link']['qs'] = self.get_location_qs()
-            result += self.inject(Action, action)
+            result += self.inject(Action, dict(action, link=dict(
+                {'qs': self.get_location_qs()}, **action['link'])))
         return result
 
     def render_search(self):
@@ -193,6 +277,16 @@ class ChangeList(Component):
         return ''.join(chain(*self.build(('actions', 'search', 'filters'))))
 
     def DOM(self):
+        if self.streaming:
+            return Node(children=self.props.reference([
+                self.insert(
+                    Column,
+                    {'md': 9, 'class': 'list-qs'},
+                    self.stream_queryset()).render_node(),
+                self.insert(
+                    Column,
+                    {'md': 3, 'class': 'list-panel'},
+                    defer(lambda: [self.render_panel()])).render_node()]))
         return ''.join(self.props.reference([
             self.inject(Column, {'md': 9, 'class': 'list-qs'}, self.render_queryset()),
             self.inject(Column, {'md': 3, 'class': 'list-panel'}, self.render_panel())]))
@@ -5,13 +5,14 @@ from urllib.parse import urlencode
 
 from ..utils.functools import just, call, factual, reduce_dict, omit, pick, truthful
 from ..utils.translation import _
-from .library import register, Import, Component, ComplexComponent, Tag
+from .library import register, render_many, Import, Component, ComplexComponent, Tag
 
 
 @register.era
 class Icon(Tag):
     el = 'i'
     inline = True
+    pure = True
 
     def get_defaults(self):
         return {'fixed': True, 'nodelist': ''}
@@ -65,6 +66,8 @@ class IconicList(Component):
 
 @register.era
 class Break(Component):
+    pure = True
+
     def get_defaults(self):
         return {'x': 1, 'ruler': False}
 
@@ -81,6 +84,8 @@ class Break(Component):
 
 @register.era
 class ProgressBar(Tag):
+    pure = True
+
     def get_defaults(self):
         return {'level': 'success'}
 
@@ -132,6 +137,7 @@ class Column(Tag):
 class Link(Tag):
     el = 'a'
     named = False
+    pure = True
 
     def get_defaults(self):
         return {
@@ -188,6 +194,7 @@ class Button(Tag):
 @register.era
 class Label(Tag):
     el = 'span'
+    pure = True
 
     def get_defaults(self):
         return {'level': 'default'}
@@ -229,6 +236,7 @@ class Well(Tag):
 @register.era
 class Caption(Tag):
     el = 'span'
+    pure = True
 
     def resolve_props(self):
         if isinstance(self.props.get('icon'), str):
@@ -417,18 +425,20 @@ class Table(Tag):
                 {'name': (content and 'check' or 'minus') + '-circle'})
         return content
 
-    def render_items(self, items, cell='td'):
-        return ''.join(map(
-            lambda row: self.inject(
-                Tag,
+    def render_cells(self, row, cell='td'):
+        return ''.join(render_many(Tag, map(
+            lambda c: {'el': cell, 'nodelist': self.render_content(c, cell)},
+            self.slice(row['items'])), context=self.context, owner=self))
+
+    def stream_items(self, items, cell='td'):
+        return render_many(Tag, map(
+            lambda row: dict(
                 truthful({'el': 'tr', 'class': row.get('level')}),
-                ''.join(map(
-                    lambda c: self.inject(
-                        Tag,
-                        {'el': cell},
-                        self.render_content(c, cell)),
-                    self.slice(row['items'])))),
-            items))
+                nodelist=self.render_cells(row, cell)),
+            items), context=self.context, owner=self)
+
+    def render_items(self, items, cell='td'):
+        return ''.join(self.stream_items(items, cell))
 
     def resolve_attrs(self):
         return {
@@ -440,7 +450,24 @@ class Table(Tag):
                 'responsive',
                 prefix='table')}
 
+    def stream_nodelist(self):
+        body = iter(self.get_tbody_items())
+        row = next(body, None)
+        if row is None:
+            yield _('(None)')
+        else:
+            yield self.inject(
+                Tag,
+                {'el': 'thead'},
+                self.render_items([{'items': self.get_thead_items()}], cell='th'))
+            yield self.insert(
+                Tag,
+                {'el': 'tbody'},
+                self.stream_items(chain([row], body))).render_node()
+
     def get_nodelist(self):
+        if self.streaming:
+            return self.stream_nodelist()
         body = list(self.get_tbody_items())
         if not len(list(body)):
             return _('(None)')
@@ -1,6 +1,66 @@
-from django.test import SimpleTestCase
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections, models
+from django.test import RequestFactory, SimpleTestCase
+from ..utils.queries import QueryCapture
+
+
+class Entry(models.Model):
+    title = models.CharField(max_length=100)
+    body = models.TextField()
+
+    class Meta:
+        app_label = 'era'
+
+
+class SqliteTestCase(SimpleTestCase):
+    using = 'era_sqlite'
+    entries = []
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connections.databases[cls.using] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:'}
+        with connections[cls.using].schema_editor() as editor:
+            editor.create_model(Entry)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connections[cls.using].schema_editor() as editor:
+            editor.delete_model(Entry)
+        connections[cls.using].close()
+        del connections.databases[cls.using]
+        super().tearDownClass()
+
+    def setUp(self):
+        self.entries = Entry.objects.using(self.using)
+        self.entries.all().delete()
+        self.entries.bulk_create(map(
+            lambda e: Entry(pk=e[0], title=e[1], body=e[2]),
+            [
+                (1, 'Quarterly report', 'revenue "grew"'),
+                (2, 'Weekly notes', 'nothing to report'),
+                (3, 'Roadmap', 'reporting tools')]))
 
 
 class IsOkTestCase(SimpleTestCase):
     def assertOk(self, x):
         self.assertEqual(x, 'ok')
+
+
+class QueryBudgetMixin:
+    def assertViewQueries(self, view, url, n=None, user=None, **kw):
+        request = RequestFactory().get(url, **kw)
+        request.user = user or AnonymousUser()
+        with QueryCapture() as capture:
+            response = (view.as_view() if isinstance(view, type) else view)(request)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        if n is None:
+            self.assertLessEqual(capture.count, view.max_queries, '\n'.join(
+                map(lambda query: query['sql'], capture.queries)))
+        else:
+            self.assertEqual(capture.count, n, '\n'.join(
+                map(lambda query: query['sql'], capture.queries)))
+        return response
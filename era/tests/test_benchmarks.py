@@ -0,0 +1,12 @@
+from .base import SimpleTestCase
+from ..utils import benchmarks
+
+
+class BenchmarksTestCase(SimpleTestCase):
+    def test_run(self):
+        names = ['table-10', 'navbar', 'form', 'accordion']
+        results = benchmarks.run(names, number=1, repeat=1)
+        self.assertEqual(list(results), names)
+        for result in results.values():
+            self.assertTrue(result['size'])
+            self.assertTrue(result['time_ms'] > 0)
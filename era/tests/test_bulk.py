@@ -0,0 +1,38 @@
+from unittest import skipUnless
+
+from ..utils import search
+from ..views.lists import CollectionView
+from .base import Entry, SqliteTestCase
+from .test_search import check_fts5
+
+
+class BulkActionTestCase(SqliteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.view = CollectionView(model=Entry, bulk_chunk_size=2)
+        self.engine = search.FTS5Engine(Entry, ['title'], using=self.using)
+        self.indexes, search.indexes = search.indexes, {Entry: self.engine}
+
+    def tearDown(self):
+        search.indexes = self.indexes
+
+    def run_action(self, action, **kw):
+        return self.view.run_bulk_action(action, self.entries.filter(**kw))
+
+    @skipUnless(check_fts5(), 'sqlite is built without fts5')
+    def test_update(self):
+        self.engine.create_index(rebuild=True)
+        self.assertEqual(self.run_action({'update': {'title': 'Archived'}}, pk__in=[1, 2, 3]), 3)
+        self.assertEqual(set(self.entries.values_list('title', flat=True)), {'Archived'})
+        self.assertEqual(
+            sorted(self.engine.search(self.entries.all(), 'archived').values_list('pk', flat=True)),
+            [1, 2, 3])
+
+    @skipUnless(check_fts5(), 'sqlite is built without fts5')
+    def test_delete(self):
+        self.engine.create_index(rebuild=True)
+        self.assertEqual(self.run_action({'delete': True}, pk__in=[1, 3]), 2)
+        self.assertEqual(list(self.entries.values_list('pk', flat=True)), [2])
+        self.assertEqual(
+            list(self.engine.search(self.entries.all(), 'roadmap').values_list('pk', flat=True)),
+            [])
@@ -0,0 +1,23 @@
+from ..utils.cache import LRUCache
+from .base import SimpleTestCase
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = LRUCache(maxsize=2)
+
+    def test_eviction(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_info(self):
+        self.cache.set('a', 1)
+        self.cache.get('a')
+        self.cache.get('b')
+        self.assertEqual(tuple(self.cache.info()), (1, 1, 2, 1))
+        self.cache.clear()
+        self.assertEqual(tuple(self.cache.info()), (0, 0, 2, 0))
@@ -0,0 +1,31 @@
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from ..utils.export import format_cell, write_csv
+from ..views.lists import CollectionView
+from .base import Entry, SimpleTestCase
+
+
+class ExportTestCase(SimpleTestCase):
+    def test_format_cell(self):
+        self.assertEqual(format_cell(None), '')
+        self.assertEqual(format_cell(3), 3)
+        self.assertEqual(format_cell(['a']), "['a']")
+
+    def test_write_csv(self):
+        self.assertEqual(
+            list(write_csv([['name', 'count'], ['a,b', 2]])),
+            ['name,count\r\n', '"a,b",2\r\n'])
+
+    def test_write_csv_formula(self):
+        self.assertEqual(
+            list(write_csv([['=1+2', '-', '@a', 'a=b', -1]])),
+            ["'=1+2,'-,'@a,a=b,-1\r\n"])
+
+    def test_export_url(self):
+        view = CollectionView(
+            model=Entry,
+            request=RequestFactory().get('/entries/', {'tag': ['a', 'b'], 'page': 2}))
+        path, qs = view.get_export_url('csv').split('?')
+        self.assertEqual(path, '/entries/')
+        self.assertEqual(dict(QueryDict(qs).lists()), {'tag': ['a', 'b'], 'export': ['csv']})
@@ -1,4 +1,4 @@
-from ..utils.functools import unidec, pluck, separate, pick, omit, truthful, avg
+from ..utils.functools import unidec, pluck, separate, pick, omit, truthful, freeze, avg
 from .base import SimpleTestCase, IsOkTestCase
 
 
@@ -54,3 +54,19 @@ class PluckTestCase(SimpleTestCase):
         self.assertEqual(
             pluck([O(1), O(2), O(3)], 'x'),
             [1, 2, 3])
+
+
+class FreezeTestCase(SimpleTestCase):
+    def test_equal(self):
+        self.assertEqual(
+            freeze({'a': [1, {'b': 2}], 'c': {3}}),
+            freeze({'c': {3}, 'a': [1, {'b': 2}]}))
+
+    def test_hashable(self):
+        hash(freeze({'a': [], 'b': {}}))
+
+    def test_iterator(self):
+        self.assertRaises(TypeError, freeze, {'a': map(str, [1])})
+
+    def test_fn(self):
+        self.assertEqual(freeze({'a': [1, 0]}, str), frozenset([('a', ('1', '0'))]))
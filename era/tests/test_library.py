@@ -0,0 +1,171 @@
+from types import MappingProxyType
+from django.template import Context
+
+from ..templatetags.library import Component, Node, Props, render_many
+from ..templatetags.lists import Checkbox
+from ..templatetags.markup import Icon, Label, Button, Link, Column
+from ..utils.functools import pick, omit
+from .base import Entry, SimpleTestCase
+
+
+class NodeTestCase(SimpleTestCase):
+    def test_build(self):
+        self.assertEqual(
+            str(Node('div', {'class': 'x', 'hidden': None}, [Node('i'), 'text'])),
+            '<div class="x" hidden><i></i>text</div>')
+
+    def test_nobody(self):
+        self.assertEqual(
+            str(Node('input', {'type': 'text'}, nobody=True)),
+            '<input type="text" />')
+
+    def test_parse(self):
+        node = Node.parse('<select name="a"><option>1</option></select>')
+        self.assertEqual(node.el, 'select')
+        self.assertEqual(node.attrs, {'name': 'a'})
+        self.assertEqual(node.children, ['<option>1</option>'])
+
+    def test_parse_tail(self):
+        node = Node.parse('<input type="text" /><script></script>')
+        node.add_attr('required')
+        self.assertEqual(str(node), '<input type="text" required /><script></script>')
+
+    def test_parse_siblings(self):
+        node = Node.parse('<ul class="">x</ul><script>y</script>')
+        node.add_class('nav')
+        self.assertEqual(node.attrs, {'class': 'nav'})
+        self.assertEqual(str(node), '<ul class="nav">x</ul><script>y</script>')
+
+    def test_parse_empty_attr(self):
+        node = Node.parse('<option value="" selected>-</option>')
+        self.assertEqual(node.attrs, {'value': '', 'selected': None})
+        self.assertEqual(str(node), '<option value="" selected>-</option>')
+
+    def test_falsy_child(self):
+        self.assertEqual(str(Node('td', {}, 0)), '<td>0</td>')
+        self.assertEqual(str(Node('td', {}, None)), '<td></td>')
+
+    def test_children_copy(self):
+        children = ['a']
+        node = Node('p', {}, children)
+        node.append('b')
+        self.assertEqual(children, ['a'])
+
+    def test_tweak(self):
+        node = Node('ul', {'class': 'nav'}, ['<li></li>'])
+        node.add_class('nav-pills')
+        node.prepend('a')
+        node.append('b')
+        node.before('c')
+        node.after('d')
+        self.assertEqual(str(node), 'c<ul class="nav nav-pills">a<li></li>b</ul>d')
+
+    def test_stream(self):
+        node = Node('tbody', children=(Node('tr', children=str(i)) for i in range(2)))
+        self.assertEqual(
+            list(node.stream()),
+            ['<tbody>', '<tr>', '0', '</tr>', '<tr>', '1', '</tr>', '</tbody>'])
+
+    def test_empty(self):
+        node = Node.parse('<li class="x">item</li>')
+        node.empty()
+        self.assertEqual(str(node), '')
+
+
+class PropsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.defaults = MappingProxyType({'level': 'default', 'fixed': True})
+        self.props = Props({'name': 'x'}, self.defaults)
+
+    def test_lookup(self):
+        self.assertEqual(self.props.name, 'x')
+        self.assertEqual(self.props['level'], 'default')
+        self.assertRaises(AttributeError, lambda: self.props.missing)
+
+    def test_override(self):
+        self.props.update({'level': 'primary'})
+        self.assertEqual(self.props.level, 'primary')
+        self.assertEqual(self.defaults['level'], 'default')
+
+    def test_pop_default(self):
+        self.assertTrue(self.props.pop('fixed'))
+        self.assertFalse('fixed' in self.props)
+        self.assertTrue('fixed' in self.defaults)
+
+    def test_pop_override(self):
+        props = Props({'fixed': False}, self.defaults)
+        self.assertFalse(props.pop('fixed'))
+        self.assertFalse('fixed' in props)
+        self.assertTrue(self.defaults['fixed'])
+
+    def test_pick_omit(self):
+        self.assertEqual(pick(self.props, 'name', 'level'), {'name': 'x', 'level': 'default'})
+        self.assertEqual(omit(self.props, 'fixed'), {'name': 'x', 'level': 'default'})
+
+
+class CompileTestCase(SimpleTestCase):
+    def render(self, cls, props, compiled=False):
+        obj = cls(context={})
+        obj.set_props(props)
+        return cls.compile(obj)(obj) if compiled else Component.render_markup(obj)
+
+    def assertCompiled(self, cls, props):
+        self.assertEqual(self.render(cls, props, True), self.render(cls, props))
+
+    def test_compile(self):
+        self.assertCompiled(Icon, {'name': 'check', 'size': 2})
+        self.assertCompiled(Label, {'nodelist': 'new', 'class': 'pull-right'})
+        self.assertCompiled(Button, {'nodelist': 'Save', 'type': 'submit', 'id': 'save'})
+        self.assertCompiled(Link, {'url': '/about', 'reverse': False, 'newtab': True})
+        self.assertCompiled(Column, {'nodelist': 'x', 'constrict': 2, 'sm': 6})
+        self.assertCompiled(Checkbox, {'name': 'pk', 'value': 1})
+
+    def test_compile_nodelist(self):
+        for nodelist in [None, 0, '', Node('b', children='x')]:
+            self.assertCompiled(Label, {'nodelist': nodelist})
+
+    def test_none_nodelist(self):
+        self.assertEqual(
+            self.render(Label, {'nodelist': None}),
+            '<span class="label label-default"></span>')
+
+
+class CacheKeyTestCase(SimpleTestCase):
+    def get_obj(self, cls, props):
+        obj = cls(context={})
+        obj.set_props(props)
+        return obj
+
+    def test_node_prop(self):
+        self.assertEqual(
+            self.get_obj(Label, {'nodelist': Node('b', children='x')}).get_cache_key(),
+            self.get_obj(Label, {'nodelist': Node('b', children='x')}).get_cache_key())
+
+    def test_model_prop(self):
+        self.assertIsNone(self.get_obj(Label, {'nodelist': Entry(pk=1)}).get_cache_key())
+
+    def test_inherited_pure(self):
+        class Badge(Label):
+            pass
+
+        self.assertTrue(self.get_obj(Label, {}).check_pure())
+        self.assertFalse(self.get_obj(Badge, {}).check_pure())
+
+
+class RenderManyTestCase(SimpleTestCase):
+    def test_context(self):
+        context = Context({'request': None})
+        depth = len(context.dicts)
+        self.assertEqual(
+            list(render_many(Label, [{'nodelist': 'a'}, {'nodelist': 'b'}], context=context)),
+            ['<span class="label label-default">a</span>', '<span class="label label-default">b</span>'])
+        self.assertEqual(len(context.dicts), depth)
+
+    def test_owner(self):
+        class Taint(Label):
+            def get_nodelist(self):
+                return str(self.request)
+
+        owner = Label(context={})
+        list(render_many(Taint, [{}], context={}, owner=owner))
+        self.assertTrue(owner.tainted)
@@ -0,0 +1,19 @@
+from ..utils.queries import QueryTrace, normalize_sql
+from .base import SimpleTestCase
+
+
+class QueryTraceTestCase(SimpleTestCase):
+    def test_normalize(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t1 WHERE id = 15 AND name = \'x\'  AND pk IN (%s, %s)'),
+            'SELECT * FROM t1 WHERE id = ? AND name = ? AND pk IN (?)')
+
+    def test_repeated(self):
+        trace = QueryTrace()
+        for i in range(3):
+            trace.record('SELECT * FROM a WHERE id = {0}'.format(i), 0.001)
+        trace.record('SELECT * FROM b', 0.001)
+        repeated = trace.get_repeated(3)
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0][0], 'SELECT * FROM a WHERE id = ?')
+        self.assertEqual(repeated[0][1].count, 3)
@@ -0,0 +1,37 @@
+import sqlite3
+from unittest import skipUnless
+
+from ..utils.search import IcontainsEngine, FTS5Engine
+from .base import Entry, SqliteTestCase
+
+
+def check_fts5():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(a)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+class SearchTestCase(SqliteTestCase):
+    def search(self, engine, query):
+        return sorted(engine.search(self.entries.all(), query).values_list('pk', flat=True))
+
+    def test_icontains(self):
+        engine = IcontainsEngine(Entry, ['title', 'body'])
+        self.assertEqual(self.search(engine, 'report'), [1, 2, 3])
+        self.assertEqual(self.search(engine, 'report weekly'), [2])
+        self.assertEqual(self.search(engine, '"grew"'), [1])
+
+    @skipUnless(check_fts5(), 'sqlite is built without fts5')
+    def test_fts5(self):
+        engine = FTS5Engine(Entry, ['title', 'body'], using=self.using)
+        engine.create_index(rebuild=True)
+        self.assertEqual(self.search(engine, 'report'), [1, 2, 3])
+        self.assertEqual(self.search(engine, 'repo "notes'), [2])
+        self.entries.filter(pk=2).update(title='Weekly summary')
+        engine.index(self.entries.get(pk=2))
+        engine.unindex([3])
+        self.assertEqual(self.search(engine, 'notes'), [])
+        self.assertEqual(self.search(engine, 'summary'), [2])
+        self.assertEqual(self.search(engine, 'reporting'), [])
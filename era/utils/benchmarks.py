@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from itertools import chain
+from timeit import default_timer
+import json
+import os
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from django import forms
+from django.contrib.auth.models import AnonymousUser, Group
+from django.forms.models import modelformset_factory
+from django.test import RequestFactory
+
+from ..components import Component, Navbar, Menu, Accordion, Table, Form
+from .functools import unpack_args
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'benchmarks.json')
+registry = OrderedDict()
+
+
+def benchmark(name):
+    def register(fn):
+        registry[name] = fn
+        return fn
+    return register
+
+
+def get_request(path='/'):
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return request
+
+
+def table_rows(count):
+    return list(map(
+        lambda i: {'items': [str(i), 'row {0}'.format(i), bool(i % 2), i % 3 == 0, '-']},
+        range(count)))
+
+
+def table(count):
+    return lambda request: Table.as_string(
+        request,
+        thead=['#', 'title', 'active', 'checked', 'note'],
+        tbody=table_rows(count))
+
+
+for count in (10, 100, 1000):
+    benchmark('table-{0}'.format(count))(table(count))
+
+
+@benchmark('navbar')
+def navbar(request):
+    def item(i, **kw):
+        return dict({
+            'caption': {'icon': 'circle', 'title': 'item {0}'.format(i)},
+            'link': {'url': '/{0}/'.format(i), 'reverse': False},
+            'active': i == 1}, **kw)
+
+    dropdown = Menu(context={'request': request})
+    dropdown.set_props({'items': list(map(item, range(10, 16)))})
+    return Navbar.as_string(
+        request,
+        head='',
+        text='',
+        brand='era',
+        container=True,
+        fixed='top',
+        collapse=Menu.as_string(request, items=list(chain(
+            map(item, range(8)),
+            [item(8, dropdown=dropdown)]))))
+
+
+class BenchmarkForm(forms.Form):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        for i in range(30):
+            self.fields['field_{0}'.format(i)] = forms.CharField(
+                label='field {0}'.format(i),
+                help_text='help {0}'.format(i),
+                required=bool(i % 2))
+
+
+@benchmark('form')
+def form(request):
+    formset = modelformset_factory(Group, fields=['name'], extra=5)(
+        queryset=Group.objects.none())
+    obj = Form(context={
+        'request': request,
+        'csrf_token': 'benchmark',
+        'form': BenchmarkForm(),
+        'formsets': [formset]})
+    obj.set_props({'actions': [], 'panels': True, 'splitters': ['field_14']})
+    return obj.render_dom()
+
+
+class BenchmarkAccordion(Accordion):
+    def get_objects(self):
+        return self.props.objects
+
+
+@benchmark('accordion')
+def accordion(request):
+    return BenchmarkAccordion.as_string(request, prefix='panel-', objects=list(map(
+        lambda i: {
+            'pk': i,
+            'caption': {'icon': 'folder', 'title': 'panel {0}'.format(i)},
+            'body': 'body {0}'.format(i)},
+        range(50))))
+
+
+def measure(fn, request, number=10, repeat=3):
+    timings = []
+    for i in range(repeat):
+        started = default_timer()
+        for j in range(number):
+            Component.render_cache.clear()
+            fn(request)
+        timings.append((default_timer() - started) / number)
+    Component.render_cache.clear()
+    result = {'time_ms': min(timings) * 1000, 'peak_kb': None, 'blocks': None}
+    if tracemalloc is None:
+        result['size'] = len(fn(request))
+        return result
+    tracemalloc.start()
+    try:
+        output = fn(request)
+        snapshot = tracemalloc.take_snapshot()
+        result['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    result['blocks'] = sum(map(lambda stat: stat.count, snapshot.statistics('filename')))
+    result['size'] = len(output)
+    return result
+
+
+def run(names=None, **kw):
+    request = get_request()
+    return OrderedDict(map(
+        lambda name: (name, measure(registry[name], request, **kw)),
+        names or registry.keys()))
+
+
+def load_baseline(path=BASELINE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+
+
+def compare(results, baseline, tolerance=0.2):
+    return OrderedDict(filter(
+        unpack_args(lambda name, diff: diff > tolerance),
+        map(
+            lambda name: (name, results[name]['time_ms'] / baseline[name]['time_ms'] - 1),
+            filter(lambda name: name in baseline, results))))
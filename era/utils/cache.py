@@ -0,0 +1,94 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock, local
+from time import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+pending = local()
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.data:
+                self.hits += 1
+                self.data.move_to_end(key)
+                return self.data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = 0
+
+
+def get_fragment_cache():
+    return caches[getattr(settings, 'ERA_FRAGMENT_CACHE', 'default')]
+
+
+def get_model_label(model):
+    if isinstance(model, str):
+        return model.lower()
+    return '.'.join([model._meta.app_label, model._meta.model_name])
+
+
+def check_watched(*models):
+    return set(map(get_model_label, models)) <= set(map(
+        get_model_label, getattr(settings, 'ERA_CACHED_MODELS', [])))
+
+
+def get_version_key(model):
+    return 'era:version:' + get_model_label(model)
+
+
+def get_versions(*models):
+    cache = get_fragment_cache()
+    keys = list(map(get_version_key, models))
+    versions = cache.get_many(keys)
+    for key in keys:
+        if not key in versions:
+            cache.add(key, int(time() * 1000), None)
+            versions[key] = cache.get(key)
+    return list(map(versions.get, keys))
+
+
+def bump_version(model):
+    cache = get_fragment_cache()
+    key = get_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time() * 1000), None)
+
+
+def touch_model(model, using=None):
+    bump_version(model)
+    if transaction.get_connection(using).in_atomic_block:
+        pending.models = getattr(pending, 'models', set()) | {get_model_label(model)}
+
+
+def touch_pending(**kw):
+    for label in getattr(pending, 'models', set()):
+        bump_version(label)
+    pending.models = set()
@@ -0,0 +1,60 @@
+from hashlib import md5
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.sql.datastructures import EmptyResultSet
+
+from .cache import get_fragment_cache, get_versions
+
+
+def count_exact(qs):
+    return qs.count()
+
+
+def count_cached(qs, timeout=None):
+    try:
+        sql, params = qs.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = 'era:count:' + md5(json.dumps(
+        [qs.db, sql, params, get_versions(qs.model)],
+        default=str).encode()).hexdigest()
+    cache = get_fragment_cache()
+    result = cache.get(key)
+    if result is None:
+        result = qs.count()
+        cache.set(key, result, timeout or getattr(settings, 'ERA_COUNT_TIMEOUT', 60))
+    return result
+
+
+def estimate_postgresql(qs, cursor):
+    if not qs.query.where.children:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [qs.model._meta.db_table])
+        row = cursor.fetchone()
+        return row and row[0] >= 0 and int(row[0]) or None
+    try:
+        sql, params = qs.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+ESTIMATORS = {'postgresql': estimate_postgresql}
+
+
+def count_estimated(qs):
+    connection = connections[qs.db]
+    method = ESTIMATORS.get(connection.vendor)
+    if method:
+        with connection.cursor() as cursor:
+            result = method(qs, cursor)
+        if result is not None:
+            return result
+    return count_exact(qs)
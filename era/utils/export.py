@@ -0,0 +1,52 @@
+import csv
+from tempfile import TemporaryFile
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def format_cell(value):
+    if value is None:
+        return ''
+    elif isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def escape_formula(value):
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def write_csv(rows):
+    writer = csv.writer(Echo())
+    return map(lambda row: writer.writerow(list(map(escape_formula, row))), rows)
+
+
+def write_xlsx(rows, chunk_size=65536):
+    with TemporaryFile() as f:
+        workbook = xlsxwriter.Workbook(f, {
+            'constant_memory': True,
+            'strings_to_formulas': False})
+        sheet = workbook.add_worksheet()
+        for i, row in enumerate(rows):
+            sheet.write_row(i, 0, row)
+        workbook.close()
+        f.seek(0)
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+
+writers = {'csv': ('text/csv', write_csv)}
+if xlsxwriter is not None:
+    writers['xlsx'] = (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        write_xlsx)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator, Mapping
 from functools import reduce, wraps
 from itertools import chain, tee
 from random import choice
@@ -20,6 +21,10 @@ def unpack_args(fn):
 def throw(exception):
     raise exception
 
+def defer(fn, *args, **kw):
+    for item in fn(*args, **kw):
+        yield item
+
 def unidec(fnx):
     '''
     @unidec
@@ -104,6 +109,18 @@ def map_values(k, v, fn):
     return (k, fn(v))
 
 
+def freeze(obj, fn=None):
+    if isinstance(obj, Mapping):
+        return frozenset(reduce_dict(lambda k, v: (k, freeze(v, fn)), obj))
+    elif isinstance(obj, (set, frozenset)):
+        return frozenset(map(lambda x: freeze(x, fn), obj))
+    elif isinstance(obj, (list, tuple)):
+        return tuple(map(lambda x: freeze(x, fn), obj))
+    elif isinstance(obj, Iterator):
+        raise TypeError('can not freeze iterator')
+    return obj if fn is None else fn(obj)
+
+
 def avg(*args):
     return reduce(lambda x, y: x + y, args) / len(args)
 
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import atexit
+
+from django.conf import settings
+from django.db import connections
+from django.utils import translation
+
+state = {'executor': None, 'connections': set()}
+lock = Lock()
+
+
+def get_executor():
+    with lock:
+        if state['executor'] is None:
+            state['executor'] = ThreadPoolExecutor(
+                getattr(settings, 'ERA_PARALLEL_WORKERS', 4))
+    return state['executor']
+
+
+def keep_connections():
+    # worker threads hold on to their connections between tasks instead of
+    # reconnecting per task, broken ones are dropped like close_old_connections does
+    for conn in connections.all():
+        if conn.connection is not None and conn.errors_occurred and not conn.is_usable():
+            conn.close()
+        if conn.connection is not None:
+            with lock:
+                state['connections'].add(conn)
+
+
+def run(language, fn, *args, **kw):
+    translation.activate(language)
+    try:
+        return fn(*args, **kw)
+    finally:
+        translation.deactivate()
+        keep_connections()
+
+
+def submit(fn, *args, **kw):
+    return get_executor().submit(run, translation.get_language(), fn, *args, **kw)
+
+
+@atexit.register
+def shutdown():
+    with lock:
+        executor, state['executor'] = state['executor'], None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    with lock:
+        pending, state['connections'] = state['connections'], set()
+    for conn in pending:
+        conn.allow_thread_sharing = True
+        conn.close()
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import local
+from time import perf_counter
+
+state = local()
+
+
+class RenderStats:
+    def __init__(self):
+        self.count = 0
+        self.wall = 0.0
+        self.own = 0.0
+        self.size = 0
+
+
+class RenderProfile:
+    def __init__(self):
+        self.stats = defaultdict(RenderStats)
+        self.stack = []
+
+    def enter(self):
+        self.stack.append([perf_counter(), 0.0])
+
+    def leave(self, cls, output):
+        started, children = self.stack.pop()
+        wall = perf_counter() - started
+        if self.stack:
+            self.stack[-1][1] += wall
+        stats = self.stats[cls]
+        stats.count += 1
+        stats.wall += wall
+        stats.own += wall - children
+        stats.size += len(output or '')
+
+    def get_top(self, limit=None):
+        return sorted(
+            self.stats.items(),
+            key=lambda item: item[1].own,
+            reverse=True)[:limit]
+
+    def as_header(self, limit=10):
+        return ', '.join(map(
+            lambda item: '{0};dur={1:.2f};desc="{2}x, {3}b"'.format(
+                item[0].__name__, item[1].own * 1000, item[1].count, item[1].size),
+            self.get_top(limit)))
+
+    def as_text(self, limit=None):
+        return '\n'.join(map(
+            lambda item: '{0}.{1}: count={2} wall={3:.2f}ms self={4:.2f}ms bytes={5}'.format(
+                item[0].__module__, item[0].__name__, item[1].count,
+                item[1].wall * 1000, item[1].own * 1000, item[1].size),
+            self.get_top(limit)))
+
+
+def get_profile():
+    return getattr(state, 'profile', None)
+
+
+def start_profile():
+    state.profile = RenderProfile()
+    return state.profile
+
+
+def stop_profile():
+    profile = get_profile()
+    state.profile = None
+    return profile
+
+
+@contextmanager
+def profile_render():
+    profile = start_profile()
+    try:
+        yield profile
+    finally:
+        stop_profile()
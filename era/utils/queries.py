@@ -0,0 +1,150 @@
+from collections import Counter, defaultdict
+from itertools import chain
+from threading import local
+from time import perf_counter
+import os
+import re
+import traceback
+
+from django.db import connections
+
+state = local()
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCapture:
+    def __init__(self, *using):
+        self.using = using
+
+    def __enter__(self):
+        self.states = list(map(
+            lambda connection: (connection, connection.force_debug_cursor, len(connection.queries_log)),
+            map(connections.__getitem__, self.using) if self.using else connections.all()))
+        for connection, debug, start in self.states:
+            connection.force_debug_cursor = True
+        self.queries = []
+        return self
+
+    def __exit__(self, *args):
+        self.queries = list(chain(*map(
+            lambda state: list(state[0].queries_log)[state[2]:],
+            self.states)))
+        for connection, debug, start in self.states:
+            connection.force_debug_cursor = debug
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time(self):
+        return sum(map(lambda query: float(query['time']), self.queries))
+
+
+def normalize_sql(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def get_call_site(stack=None):
+    for frame in reversed(stack or traceback.extract_stack()[:-2]):
+        if frame[0].startswith(root) and not frame[0].startswith(os.path.join(root, 'utils')):
+            return '{0}:{1} in {2}'.format(os.path.relpath(frame[0], root), frame[1], frame[2])
+    return None
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.sites = Counter()
+
+
+class QueryTrace:
+    def __init__(self):
+        self.stats = defaultdict(QueryStats)
+
+    def record(self, sql, duration):
+        stats = self.stats[normalize_sql(sql)]
+        stats.count += 1
+        stats.time += duration
+        stats.sites[get_call_site()] += 1
+
+    def get_repeated(self, threshold=2):
+        return sorted(
+            filter(lambda item: item[1].count >= threshold, self.stats.items()),
+            key=lambda item: item[1].time,
+            reverse=True)
+
+    def as_text(self, threshold=2):
+        return '\n'.join(map(
+            lambda item: '{0}x {1:.2f}ms {2}\n    {3}'.format(
+                item[1].count, item[1].time * 1000, item[0],
+                '\n    '.join(map(
+                    lambda site: '{0}x {1}'.format(site[1], site[0] or '<outside era>'),
+                    item[1].sites.most_common()))),
+            self.get_repeated(threshold)))
+
+
+class TracingCursor:
+    def __init__(self, cursor, trace):
+        self.cursor = cursor
+        self.trace = trace
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return self.cursor.__exit__(*args)
+
+    def execute(self, sql, params=None):
+        started = perf_counter()
+        try:
+            return self.cursor.execute(sql, params)
+        finally:
+            self.trace.record(sql, perf_counter() - started)
+
+    def executemany(self, sql, param_list):
+        started = perf_counter()
+        try:
+            return self.cursor.executemany(sql, param_list)
+        finally:
+            self.trace.record(sql, perf_counter() - started)
+
+
+def get_trace():
+    return getattr(state, 'trace', None)
+
+
+def start_tracing():
+    trace = state.trace = QueryTrace()
+    state.connections = []
+    for connection in connections.all():
+        state.connections.append((connection, connection.force_debug_cursor))
+        connection.make_debug_cursor = (lambda make: lambda cursor: TracingCursor(make(cursor), trace))(
+            type(connection).make_debug_cursor.__get__(connection))
+        connection.force_debug_cursor = True
+    return trace
+
+
+def stop_tracing():
+    trace = get_trace()
+    for connection, debug in getattr(state, 'connections', []):
+        del connection.make_debug_cursor
+        connection.force_debug_cursor = debug
+    state.trace = None
+    state.connections = []
+    return trace
@@ -0,0 +1,189 @@
+from functools import reduce
+import operator
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+
+indexes = None
+
+
+def split_query(query):
+    return query.split()
+
+
+def lookup_value(obj, field):
+    return reduce(lambda o, attr: o and getattr(o, attr, None), field.split('__'), obj)
+
+
+class SearchEngine:
+    def __init__(self, model, fields, **options):
+        self.model = model
+        self.fields = list(fields)
+        self.options = options
+
+    def get_connection(self, using=None):
+        return connections[using or self.options.get('using', 'default')]
+
+    @property
+    def connection(self):
+        return self.get_connection()
+
+    def search(self, qs, query, rank=False):
+        raise NotImplementedError
+
+
+class IcontainsEngine(SearchEngine):
+    def search(self, qs, query, rank=False):
+        for word in split_query(query):
+            qs = qs.filter(reduce(
+                operator.or_, map(
+                lambda f: Q(**{'__'.join([f, self.options.get('lookup', 'icontains')]): word}),
+                self.fields)))
+        return qs
+
+
+class PostgresEngine(SearchEngine):
+    def __init__(self, model, fields, **options):
+        super().__init__(model, fields, **options)
+        related = list(filter(lambda f: '__' in f, self.fields))
+        if related:
+            raise ImproperlyConfigured('postgresql search needs local fields: {0}'.format(
+                ', '.join(related)))
+
+    def get_config(self):
+        return self.options.get('config', getattr(settings, 'ERA_SEARCH_CONFIG', 'simple'))
+
+    def get_document(self):
+        return "to_tsvector('{0}', concat_ws(' ', {1}))".format(
+            self.get_config(),
+            ', '.join(map(
+                lambda f: '{0}.{1}'.format(
+                    self.connection.ops.quote_name(self.model._meta.db_table),
+                    self.connection.ops.quote_name(self.model._meta.get_field(f).column)),
+                self.fields)))
+
+    def get_index_sql(self):
+        return 'CREATE INDEX {0} ON {1} USING GIN (({2}))'.format(
+            '_'.join([self.model._meta.db_table, 'search']),
+            self.model._meta.db_table,
+            self.get_document())
+
+    def search(self, qs, query, rank=False):
+        words = re.findall(r'\w+', ' '.join(split_query(query)))
+        if not words:
+            return qs
+        tsquery = "to_tsquery('{0}', %s)".format(self.get_config())
+        terms = ' & '.join(map(lambda word: word + ':*', words))
+        qs = qs.extra(where=[' @@ '.join([self.get_document(), tsquery])], params=[terms])
+        if rank:
+            qs = qs.extra(
+                select={'search_rank': 'ts_rank({0}, {1})'.format(self.get_document(), tsquery)},
+                select_params=[terms],
+                order_by=['-search_rank'])
+        return qs
+
+
+class FTS5Engine(SearchEngine):
+    def get_table(self):
+        return 'era_search_' + self.model._meta.db_table
+
+    def execute(self, sql, params=None, using=None):
+        with self.get_connection(using).cursor() as cursor:
+            cursor.execute(sql, params or [])
+            return cursor.fetchall() if sql.startswith('SELECT') else None
+
+    def exists(self, using=None):
+        key = using or self.options.get('using', 'default')
+        if not key in self.options.setdefault('ready', set()) and self.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [self.get_table()], using):
+            self.options['ready'].add(key)
+        return key in self.options['ready']
+
+    def create_index(self, rebuild=False, using=None):
+        if self.exists(using):
+            if not rebuild:
+                return
+            self.execute('DROP TABLE {0}'.format(self.get_table()), using=using)
+        self.execute('CREATE VIRTUAL TABLE {0} USING fts5({1})'.format(
+            self.get_table(),
+            ', '.join(self.fields)), using=using)
+        for obj in self.model._default_manager.using(using or self.options.get('using', 'default')).iterator():
+            self.index(obj, using)
+
+    def index(self, obj, using=None):
+        self.unindex([obj.pk], using)
+        self.execute(
+            'INSERT INTO {0} (rowid, {1}) VALUES (%s, {2})'.format(
+                self.get_table(),
+                ', '.join(self.fields),
+                ', '.join(['%s'] * len(self.fields))),
+            [obj.pk] + list(map(lambda f: str(lookup_value(obj, f) or ''), self.fields)),
+            using)
+
+    def unindex(self, pks, using=None):
+        self.execute('DELETE FROM {0} WHERE rowid IN ({1})'.format(
+            self.get_table(),
+            ', '.join(['%s'] * len(pks))), list(pks), using)
+
+    def search(self, qs, query, rank=False):
+        words = list(filter(None, map(lambda word: word.replace('"', ''), split_query(query))))
+        if not words:
+            return qs
+        if not self.exists(qs.db):
+            raise ImproperlyConfigured('{0} is missing, run the searchindex command'.format(
+                self.get_table()))
+        match = ' '.join(map(lambda word: '"{0}"*'.format(word), words))
+        pk = '.'.join(map(self.connection.ops.quote_name, [
+            self.model._meta.db_table,
+            self.model._meta.pk.column]))
+        qs = qs.extra(
+            where=['{0} IN (SELECT rowid FROM {1} WHERE {1} MATCH %s)'.format(pk, self.get_table())],
+            params=[match])
+        if rank:
+            qs = qs.extra(
+                select={'search_rank': '(SELECT rank FROM {1} WHERE {1} MATCH %s AND rowid = {0})'.format(
+                    pk, self.get_table())},
+                select_params=[match],
+                order_by=['search_rank'])
+        return qs
+
+
+engines = {
+    'icontains': IcontainsEngine,
+    'postgresql': PostgresEngine,
+    'fts5': FTS5Engine}
+
+
+def get_indexes():
+    global indexes
+    if indexes is None:
+        indexes = dict(map(
+            lambda item: (apps.get_model(item[0]), FTS5Engine(apps.get_model(item[0]), item[1])),
+            getattr(settings, 'ERA_SEARCH_INDEXES', {}).items()))
+    return indexes
+
+
+def get_index(model, using=None):
+    engine = get_indexes().get(model)
+    return engine if engine and engine.exists(using) else None
+
+
+def update_index(model, obj, delete=False, using=None):
+    engine = get_index(model, using)
+    if engine and delete:
+        engine.unindex([obj.pk], using)
+    elif engine:
+        engine.index(obj, using)
+
+
+def reindex(model, pks, using=None):
+    engine = get_index(model, using)
+    if engine and pks:
+        engine.unindex(pks, using)
+        for obj in model._default_manager.using(using or 'default').filter(pk__in=pks):
+            engine.index(obj, using)
@@ -1,4 +1,4 @@
 from django.views.generic.base import RedirectView
-from .base import BaseViewMixin, BaseView, DisplayAttrMixin
+from .base import BaseViewMixin, BaseView, ConditionalMixin, DisplayAttrMixin, depends
 from .forms import FormView, MatrixView, ObjectView
 from .lists import ListView, CollectionView
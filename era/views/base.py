@@ -1,15 +1,27 @@
+from calendar import timegm
+from hashlib import md5
 from itertools import chain
+import json
+import logging
 import re
 
 from django.conf import settings
 from django.contrib import messages
 from django.core.urlresolvers import resolve, reverse
+from django.http import HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils.translation import get_language
 from django.views.generic.base import TemplateResponseMixin, View
+from ..templatetags.library import STREAM_MARKER
 from ..utils.translation import normalize
+from ..utils.queries import QueryCapture, QueryBudgetExceeded
 from ..utils.urls import dispatch_decorator
 
+logger = logging.getLogger('era.queries')
+
 
 class BaseViewMixin:
     keywords = []
@@ -38,10 +50,42 @@ class BaseView(BaseViewMixin, TemplateResponseMixin, View):
     decorators = []
     components = {}
     page_title = settings.TITLE
+    streaming = False
+    max_queries = None
+    max_query_time = None
 
     @dispatch_decorator
     def dispatch(self, request, *args, **kwargs):
-        return super().dispatch(request, *args, **kwargs)
+        if self.max_queries is None and self.max_query_time is None:
+            return super().dispatch(request, *args, **kwargs)
+        capture = QueryCapture().__enter__()
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Exception:
+            capture.__exit__()
+            raise
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            response.add_post_render_callback(lambda response: self.finish_capture(capture))
+        else:
+            self.finish_capture(capture)
+        return response
+
+    def finish_capture(self, capture):
+        capture.__exit__()
+        self.check_query_budget(capture)
+
+    def check_query_budget(self, capture):
+        errors = list(filter(None, [
+            self.max_queries is not None and capture.count > self.max_queries \
+                and '{0} queries (max {1})'.format(capture.count, self.max_queries),
+            self.max_query_time is not None and capture.time > self.max_query_time \
+                and '{0:.3f}s in queries (max {1}s)'.format(capture.time, self.max_query_time)]))
+        if errors:
+            message = '{0} {1}: {2}'.format(
+                self.__class__.__name__, self.request.path, ', '.join(errors))
+            if getattr(settings, 'ERA_QUERY_BUDGET_RAISE', settings.DEBUG):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
 
     def get_decorators(self):
         return self.decorators
@@ -70,8 +114,78 @@ class BaseView(BaseViewMixin, TemplateResponseMixin, View):
     def get_template_names(self):
         return list(map(lambda x: x + '.html', [self.about, 'index']))
 
+    def stream_content(self, context):
+        stream = []
+        chunks = render_to_string(
+            self.get_template_names(),
+            dict(context, stream=stream),
+            request=self.request).split(STREAM_MARKER)
+        yield chunks[0]
+        for obj, chunk in zip(stream, chunks[1:]):
+            for content in obj.render_node().stream():
+                yield content
+            yield chunk
+
+    def render_to_response(self, context, **kw):
+        if not self.streaming:
+            return super().render_to_response(context, **kw)
+        return StreamingHttpResponse(self.stream_content(context), **kw)
+
+
+class ConditionalMixin:
+    modified_field = None
+
+    def get_fingerprint(self):
+        return None
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag(self, fingerprint):
+        return md5(json.dumps([
+            fingerprint,
+            self.request.user.pk,
+            get_language(),
+            self.request.get_full_path()], default=str).encode()).hexdigest()
+
+    def check_modified(self):
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            return not self.etag or not self.etag in parse_etags(if_none_match)
+        since = parse_http_date_safe(self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return not (since and self.last_modified and \
+            timegm(self.last_modified.utctimetuple()) <= since)
+
+    def patch_validators(self, response):
+        if self.etag:
+            response['ETag'] = quote_etag(self.etag)
+        if self.last_modified:
+            response['Last-Modified'] = http_date(timegm(self.last_modified.utctimetuple()))
+        return response
+
+    def get(self, request, *args, **kw):
+        self.etag = self.last_modified = None
+        if not len(messages.get_messages(request)):
+            fingerprint = self.get_fingerprint()
+            self.etag = fingerprint is not None and self.get_etag(fingerprint) or None
+            self.last_modified = self.get_last_modified()
+            if not self.check_modified():
+                return self.patch_validators(HttpResponseNotModified())
+        return self.patch_validators(super().get(request, *args, **kw))
+
+
+def depends(*fields):
+    def decorator(fn):
+        fn.depends = fields
+        return fn
+    return decorator
+
 
 class DisplayAttrMixin:
+    def get_display_hook(self, attr):
+        method = 'get_{0}_display'.format(attr)
+        return getattr(self, method, None) or getattr(self.model, method, None)
+
     def display_attr(self, obj, attr, **kw):
         method = 'get_{0}_display'.format(attr)
         if isinstance(obj, self.model) and hasattr(self, method):
@@ -19,7 +19,7 @@ from ..components import Form
 from ..utils.functools import just, call, swap, throw, \
     pluck, first, select, separate, factual, case, omit, pick, map_keys, map_values
 from ..utils.translation import _, inflect, get_string, get_model_names
-from .base import BaseView
+from .base import BaseView, ConditionalMixin
 
 
 class FormFieldsOverridesMixin:
@@ -315,7 +315,7 @@ class MatrixView(FormView):
             formset.save()
 
 
-class ObjectView(FormView):
+class ObjectView(ConditionalMixin, FormView):
     def get_instance(self):
         pk = self.url_match.kwargs.get('pk')
         try:
@@ -323,6 +323,18 @@ class ObjectView(FormView):
         except ObjectDoesNotExist:
             raise Http404
 
+    def has_inlines(self):
+        return bool(self.get_relation_fields()) \
+            or type(self).get_formsets is not FormsetsMixin.get_formsets
+
+    def get_last_modified(self):
+        return self.instance and self.modified_field and not self.has_inlines() \
+            and getattr(self.instance, self.modified_field) or None
+
+    def get_fingerprint(self):
+        modified = self.get_last_modified()
+        return modified and [self.instance.pk, modified]
+
     def get_form_props(self):
         return dict(
             super().get_form_props(),
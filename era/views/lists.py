@@ -1,25 +1,88 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, time
+import json
 import operator
 from functools import reduce
 from itertools import chain
 from urllib.parse import urlencode
 
 from django.conf import settings
-from django.db.models import Count, Q
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, QuerySet, When
 from django.db.models.fields import BooleanField, FieldDoesNotExist
 from django.db.models.fields.related import ManyToOneRel
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template import engines
+from django.utils.cache import patch_vary_headers
 from django.utils.functional import cached_property
 from django.views.generic.list import BaseListView
 
 from ..components import ChangeList
-from ..utils.functools import just, call, first, pluck, pick, omit, \
+from ..utils import counts, export, parallel, search
+from ..utils.cache import check_watched, get_versions, touch_model
+from ..utils.functools import just, call, defer, unpack_args, first, pluck, pick, \
     map_keys, map_values, reduce_dict, filter_dict
 from ..utils.translation import _, get_string, get_model_names, verbose_choices
-from .base import BaseView, DisplayAttrMixin
+from .base import BaseView, ConditionalMixin, DisplayAttrMixin
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, (datetime, time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    number = None
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CountPaginator(Paginator):
+    def __init__(self, object_list, per_page, counter=counts.count_exact, **kw):
+        super().__init__(object_list, per_page, **kw)
+        self.counter = counter
+
+    def _get_count(self):
+        if self._count is None:
+            try:
+                self._count = self.counter(self.object_list)
+            except (AttributeError, TypeError):
+                return super()._get_count()
+        return self._count
+    count = property(_get_count)
 
 
 class ListView(DisplayAttrMixin, BaseView, BaseListView):
     list_display = []
+    list_select_related = []
+    list_prefetch_related = []
+    projection = None
+    field_cache = {}
+    column_cache = {}
 
     @property
     def columns(self, *args, **kw):
@@ -27,6 +90,110 @@ class ListView(DisplayAttrMixin, BaseView, BaseListView):
             self._columns = self.get_list_view('display')
         return self._columns
 
+    def get_plan_key(self, columns, *extra):
+        return (type(self), self.model, tuple(map(get_string, columns))) + extra
+
+    def get_column_plan(self, columns=None):
+        key = self.get_plan_key(columns or self.columns)
+        if not key in self.column_cache:
+            self.column_cache[key] = list(map(self.plan_display, columns or self.columns))
+        return self.column_cache[key]
+
+    def plan_display(self, column):
+        field = self.get_model_field(column)
+        return {
+            'name': column,
+            'key': self.get_column_key(column),
+            'path': get_string(column),
+            'field': field,
+            'title': self.display_column(field)}
+
+    def get_queryset_plan(self, columns=None):
+        key = self.get_plan_key(columns or self.columns, 'related')
+        if not key in self.column_cache:
+            self.column_cache[key] = self.get_related_plan(columns or self.columns)
+        return self.column_cache[key]
+
+    def get_count_key(self, column):
+        return '_era_{0}_count'.format(column)
+
+    def plan_column(self, plan, column):
+        model, path = self.model, []
+        for name in column.split('__'):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation:
+                break
+            path.append(name)
+            if field.one_to_many and path == [column] and not self.get_count_key(column) in map(
+                    lambda f: f.name, self.model._meta.get_fields()):
+                plan['annotate'][self.get_count_key(column)] = Count(column, distinct=True)
+                return plan
+            elif field.one_to_many or field.many_to_many:
+                plan['prefetch_related'].append('__'.join(path))
+                return plan
+            model = field.related_model
+        if path:
+            plan['select_related'].append('__'.join(path))
+        return plan
+
+    def get_projection(self, plan, columns):
+        mode, fields = self.projection, ['pk']
+        prefetched = tuple(chain(*map(
+            lambda path: [path, path + '__'],
+            plan['prefetch_related'])))
+        for column in map(get_string, columns):
+            field = self.get_model_field(column)
+            attr = column.replace(' ', '_')
+            hook = self.get_display_hook(attr)
+            depends = getattr(hook, 'depends', None)
+            view_hook = hasattr(self, 'get_{0}_display'.format(attr))
+            model_hook = bool(hook) and not view_hook and not getattr(field, 'choices', None)
+            if (view_hook or model_hook) and depends is None:
+                return None
+            elif isinstance(field, dict) and not view_hook:
+                return None
+            elif isinstance(field, dict) or self.get_count_key(column) in plan['annotate']:
+                pass
+            elif field.concrete and not column.startswith(prefetched):
+                fields.append(column)
+                if field.is_relation or model_hook:
+                    mode = 'only'
+            else:
+                mode = 'only'
+            fields.extend(depends or [])
+        return mode, fields
+
+    def get_related_plan(self, columns):
+        plan = reduce(
+            self.plan_column,
+            map(get_string, columns),
+            {
+                'select_related': list(self.get_list_view('select_related')),
+                'prefetch_related': list(self.get_list_view('prefetch_related')),
+                'annotate': {}})
+        plan['projection'] = self.projection and self.get_projection(plan, columns)
+        return plan
+
+    def plan_queryset(self, qs, columns=None):
+        if not isinstance(qs, QuerySet) or not qs.query.can_filter():
+            return qs
+        plan = self.get_queryset_plan(columns)
+        if plan['projection'] and plan['projection'][0] == 'values':
+            qs = qs.values(*plan['projection'][1])
+            return qs.annotate(**plan['annotate']) if plan['annotate'] else qs
+        elif plan['projection']:
+            qs = qs.only(*set(chain(plan['projection'][1], plan['select_related'])))
+        if plan['select_related']:
+            qs = qs.select_related(*set(plan['select_related']))
+        if plan['prefetch_related']:
+            qs = qs.prefetch_related(*set(plan['prefetch_related']))
+        if plan['annotate']:
+            qs = qs.annotate(**plan['annotate'])
+        return qs
+
     def get_column_key(self, column):
         if isinstance(column, str):
             return column
@@ -42,6 +209,12 @@ class ListView(DisplayAttrMixin, BaseView, BaseListView):
             end_obj=end_obj)
 
     def get_model_field(self, field):
+        key = (self.model, get_string(field))
+        if not key in self.field_cache:
+            self.field_cache[key] = self.resolve_model_field(field)
+        return self.field_cache[key]
+
+    def resolve_model_field(self, field):
         try:
             return self.lookup_field(
                 self.model,
@@ -62,8 +235,19 @@ class ListView(DisplayAttrMixin, BaseView, BaseListView):
         else:
             return field.verbose_name
 
+    def display_row(self, name, field, row):
+        attr = get_string(field['name'] if isinstance(field, dict) else name).replace(' ', '_')
+        method = 'get_{0}_display'.format(attr)
+        if hasattr(self, method):
+            return getattr(self, method)(row)
+        elif self.get_count_key(attr) in row:
+            return row[self.get_count_key(attr)]
+        return dict(getattr(field, 'choices', None) or []).get(row[attr], row[attr])
+
     def display_field(self, name, field, obj):
-        if isinstance(field, dict):
+        if isinstance(obj, dict):
+            return self.display_row(name, field, obj)
+        elif isinstance(field, dict):
             return self.display_attr(
                 obj,
                 get_string(field['name']).replace(' ', '_'),
@@ -73,20 +257,25 @@ class ListView(DisplayAttrMixin, BaseView, BaseListView):
         else:
             value = self.display_attr(obj, field.name)
             if isinstance(field, ManyToOneRel) and not isinstance(value, str):
-                return value.count()
+                key = self.get_count_key(get_string(name))
+                return getattr(obj, key) if hasattr(obj, key) else value.count()
             return value
 
+    def iter_objects(self, objects, **kw):
+        return map(
+            lambda obj: dict({'pk': obj['pk'] if isinstance(obj, dict) else obj.pk}, **dict(map(
+                lambda c: (c['key'], self.display_field(c['name'], c['field'], obj)),
+                self.get_column_plan(kw.get('columns'))))),
+            self.plan_queryset(objects, kw.get('columns')))
+
     def display_objects(self, objects, **kw):
-        return list(map(
-            lambda obj: dict({'pk': obj.pk}, **dict(map(
-                lambda c: (
-                    self.get_column_key(c),
-                    self.display_field(c, self.get_model_field(c), obj)),
-                kw.get('columns') or self.columns))),
-            objects))
+        return list(self.iter_objects(objects, **kw))
+
+    def paginate_queryset(self, queryset, page_size):
+        return super().paginate_queryset(self.plan_queryset(queryset), page_size)
 
 
-class CollectionView(ListView):
+class CollectionView(ConditionalMixin, ListView):
     autochoice = True
     components = {'content': ChangeList}
     list_filter = []
@@ -94,8 +283,19 @@ class CollectionView(ListView):
     list_sort = []
     list_search = []
     search_method = 'icontains'
+    search_engine = 'icontains'
+    facet_engine = 'group'
+    facet_limit = 500
     default_state = {}
     paginate_by = 15
+    pagination = 'offset'
+    export_formats = ['csv', 'xlsx']
+    export_chunk_size = 1000
+    bulk_actions = []
+    bulk_chunk_size = 1000
+    parallel = False
+    paginator_class = CountPaginator
+    count_strategy = 'exact'
     actions = [{
         'icon': 'plus-square',
         'title': _('Add'),
@@ -133,6 +333,12 @@ class CollectionView(ListView):
                             lambda k, v: k.startswith(method),
                             self.request.GET)))))
 
+    def get_search_engine(self):
+        return search.engines[self.search_engine](
+            self.model,
+            self.get_list_view('search'),
+            lookup=self.search_method)
+
     def get_queryset(self, ignore_state=False, ignore_attrs=None):
         if not ignore_state and self.stateful:
             qs = self.queryset or self.model.objects.all()
@@ -141,13 +347,10 @@ class CollectionView(ListView):
                     lambda k, v: not k in (ignore_attrs or []),
                     self.states['filter']))
             if 'search' in self.request.GET:
-                for word in self.request.GET['search'].split():
-                    qs = qs.filter(reduce(
-                        operator.or_, map(
-                        lambda lookup: Q(**{lookup: word}),
-                        map(
-                            lambda f: '__'.join([f, self.search_method]),
-                            self.get_list_view('search')))))
+                qs = self.get_search_engine().search(
+                    qs,
+                    self.request.GET['search'],
+                    rank=not self.states['sort'])
             if not ignore_attrs and self.states['sort']:
                 qs = qs.order_by(*reduce_dict(
                     lambda k, v: ('-' if v is False else '') + k,
@@ -155,17 +358,192 @@ class CollectionView(ListView):
             return qs
         return super().get_queryset()
 
+    def count_queryset(self, qs):
+        return getattr(counts, 'count_' + self.count_strategy)(qs)
+
+    def get_paginator(self, queryset, per_page, **kw):
+        return super().get_paginator(queryset, per_page, counter=lambda qs: self.count_queryset(
+            self.object_list if isinstance(self.object_list, QuerySet) else qs), **kw)
+
+    def check_nullable(self, path):
+        model = self.model
+        for name in path.split('__'):
+            if name == 'pk':
+                return False
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return True
+            if field.null or not field.concrete:
+                return True
+            elif not field.is_relation:
+                return False
+            model = field.related_model
+        return False
+
+    def get_key_field(self, path):
+        field = self.model._meta.pk if path == 'pk' else self.get_model_field(path)
+        return getattr(field, 'related_field', field)
+
+    def get_keyset(self):
+        paths = list(reduce_dict(
+            lambda k, v: (k, v is False),
+            self.states['sort'] if self.stateful else {}))
+        if not 'pk' in map(first, paths):
+            paths.append(('pk', False))
+        keys = chain(*map(unpack_args(lambda path, desc: chain(
+            [(path + '__isnull', desc, IntegerField())] if self.check_nullable(path) else [],
+            [(path, desc, self.get_key_field(path))])), paths))
+        return list(map(
+            unpack_args(lambda i, key: ('keyset_{0}'.format(i),) + key),
+            enumerate(keys)))
+
+    def get_key_values(self, keys, obj):
+        return list(map(
+            lambda k: obj[k[0]] if isinstance(obj, dict) else getattr(obj, k[0]),
+            keys))
+
+    def get_key_expression(self, key):
+        if key[2].endswith('__isnull'):
+            return Case(When(**{key[2]: True}, then=1), default=0, output_field=key[3])
+        return F(key[2])
+
+    def order_keyset(self, qs, keys, reverse=False):
+        return qs.annotate(**dict(map(
+            lambda k: (k[0], self.get_key_expression(k)),
+            keys))).order_by(*map(
+                lambda k: ('-' if k[1] != reverse else '') + k[0],
+                keys))
+
+    def encode_cursor(self, keys, obj, direction):
+        return urlsafe_b64encode(json.dumps({
+            'keys': list(map(lambda k: k[2], keys)),
+            'values': self.get_key_values(keys, obj),
+            'direction': direction}, cls=CursorEncoder).encode()).decode()
+
+    def clean_key_value(self, key, value):
+        if not (value is None or isinstance(value, (str, int, float))):
+            raise ValueError(value)
+        elif value is None or not hasattr(key[3], 'to_python'):
+            return value
+        return key[3].to_python(value)
+
+    def decode_cursor(self, cursor, keys):
+        try:
+            result = json.loads(urlsafe_b64decode(cursor.encode()).decode())
+            if result['keys'] != list(map(lambda k: k[2], keys)) \
+            or not isinstance(result['values'], list) \
+            or len(result['values']) != len(keys) \
+            or not result['direction'] in ('next', 'previous'):
+                return None
+            result['values'] = list(map(self.clean_key_value, keys, result['values']))
+        except (AttributeError, KeyError, TypeError, ValueError, ValidationError):
+            return None
+        return result
+
+    def seek_keyset(self, keys, values, reverse):
+        return reduce(operator.or_, map(
+            lambda i: Q(**dict(chain(
+                map(
+                    lambda k, v: (k[0] + '__isnull', True) if v is None else (k[0], v),
+                    keys[:i],
+                    values[:i]),
+                [('__'.join([keys[i][0], 'lt' if keys[i][1] != reverse else 'gt']), values[i])]))),
+            filter(lambda i: values[i] is not None, range(len(keys)))))
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+        keys = self.get_keyset()
+        cursor = self.decode_cursor(self.request.GET.get('cursor'), keys)
+        reverse = bool(cursor) and cursor['direction'] == 'previous'
+        qs = self.order_keyset(self.plan_queryset(queryset), keys, reverse)
+        if cursor:
+            qs = qs.filter(self.seek_keyset(keys, cursor['values'], reverse))
+        objects = list(qs[:page_size + 1])
+        more = len(objects) > page_size
+        objects = objects[:page_size]
+        if reverse:
+            objects.reverse()
+        page = KeysetPage(objects)
+        if objects and (more if not reverse else cursor):
+            page.next_cursor = self.encode_cursor(keys, objects[-1], 'next')
+        if objects and (more if reverse else cursor):
+            page.previous_cursor = self.encode_cursor(keys, objects[0], 'previous')
+        return (None, page, objects, page.has_other_pages())
+
+    def iter_queryset(self, queryset, chunk_size):
+        keys = self.get_keyset()
+        qs, values = self.order_keyset(self.plan_queryset(queryset), keys), None
+        while True:
+            chunk = list((qs.filter(self.seek_keyset(keys, values, False)) if values else qs)[:chunk_size])
+            for obj in chunk:
+                yield obj
+            if len(chunk) < chunk_size:
+                break
+            values = self.get_key_values(keys, chunk[-1])
+
+    def get_export_formats(self):
+        return list(filter(lambda f: f in export.writers, self.export_formats))
+
+    def iter_export(self):
+        plan = self.get_column_plan()
+        yield list(map(lambda c: str(c['title']), plan))
+        for obj in self.iter_queryset(self.get_queryset(), self.export_chunk_size):
+            yield list(map(
+                lambda c: export.format_cell(self.display_field(c['name'], c['field'], obj)),
+                plan))
+
+    def export(self, fmt):
+        content_type, writer = export.writers[fmt]
+        response = StreamingHttpResponse(writer(self.iter_export()), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="{0}.{1}"'.format(
+            self.about.replace(' ', '-'), fmt)
+        return response
+
+    def export_response(self):
+        fmt = self.request.GET.get('export')
+        if fmt in self.get_export_formats():
+            return self.export(fmt)
+
+    def count_facet(self, qs, attr):
+        return dict(map(
+            lambda row: (row[attr], row['facet_count']),
+            qs.order_by().values(attr).annotate(facet_count=Count('pk'))))
+
+    def count_facets(self, facets, state):
+        filters = self.states['filter'] if state else {}
+        qs = self.get_queryset(ignore_state=(not state), ignore_attrs=list(filters))
+        aggregates = {}
+        for i, (attr, choices) in enumerate(facets):
+            others = Q(**filter_dict(lambda k, v: k != attr, filters))
+            for j, choice in enumerate(choices):
+                aggregates['facet_{0}_{1}'.format(i, j)] = Count(Case(
+                    When(others & Q(**{attr: choice[0]}), then='pk'),
+                    output_field=self.model._meta.pk), distinct=True)
+        counts = qs.order_by().aggregate(**aggregates)
+        return list(map(
+            unpack_args(lambda i, facet: {
+                choice[0]: counts['facet_{0}_{1}'.format(i, j)]
+                for j, choice in enumerate(facet[1])}),
+            enumerate(facets)))
+
+    def add_choices(self, result, choices, counts):
+        for choice in choices:
+            count = counts.get(choice[0])
+            if count:
+                result['choices'].append(list(chain(choice, [count])))
+
     def resolve_generic_filter(self, attr, choices, state):
         result = {'key': self.map_attr(attr)}
         if choices:
             result['choices'] = []
-            values = pluck(
-                self.get_queryset(ignore_state=(not state), ignore_attrs=[attr]),
-                result['key'])
-            for choice in choices:
-                count = values.count(choice[0])
-                if count:
-                    result['choices'].append(list(chain(choice, [count])))
+            if self.facet_engine == 'conditional':
+                result['facet'] = (attr, list(choices))
+            else:
+                self.add_choices(result, choices, self.count_facet(
+                    self.get_queryset(ignore_state=(not state), ignore_attrs=[attr]),
+                    attr))
         return result
 
     def resolve_filter(self, attr, state):
@@ -192,20 +570,65 @@ class CollectionView(ListView):
             result = getattr(self, method)(attr, state=state)
         return result
 
+    def resolve_named_filter(self, name, **kw):
+        return dict({'name': name}, **self.resolve_filter(name, **kw))
+
     def resolve_filters(self, **kw):
-        return list(map(
-            lambda name: dict({'name': name}, **self.resolve_filter(name, **kw)),
-            self.get_list_view('filter')))
+        return self.count_filters(list(map(
+            lambda name: self.resolve_named_filter(name, **kw),
+            self.get_list_view('filter'))), **kw)
+
+    def count_filters(self, result, **kw):
+        pending = list(map(
+            lambda f: (f, ) + f.pop('facet'),
+            filter(lambda f: 'facet' in f, result)))
+        if pending:
+            facets = list(map(lambda f: f[1:], pending))
+            if sum(map(lambda f: len(f[1]), facets)) > self.facet_limit:
+                counts = list(map(
+                    unpack_args(lambda attr, choices: self.count_facet(
+                        self.get_queryset(ignore_state=(not kw['state']), ignore_attrs=[attr]),
+                        attr)),
+                    facets))
+            else:
+                counts = self.count_facets(facets, kw['state'])
+            for facet, count in zip(pending, counts):
+                self.add_choices(facet[0], facet[2], count)
+        return result
 
-    def get_filters(self):
+    def describe_filters(self, filters):
         return list(map(
             lambda f: dict(f, **{
                 'title': self.display_column(self.get_model_field(f['name'])),
                 'counters': f['name'] in self.get_list_view('counters')}),
-            self.resolve_filters(state=True)))
+            filters))
+
+    def get_filters(self):
+        return self.describe_filters(self.resolve_filters(state=True))
+
+    def submit_filters(self):
+        futures = list(map(
+            lambda name: parallel.submit(self.resolve_named_filter, name, state=True),
+            self.get_list_view('filter')))
+        return lambda: self.describe_filters(self.count_filters(
+            list(map(lambda future: future.result(), futures)),
+            state=True))
 
     def get_actions(self):
-        return self.actions
+        return list(chain(self.actions, map(
+            lambda fmt: {
+                'icon': 'download',
+                'title': ' '.join([str(_('Export')), fmt.upper()]),
+                'level': 'default',
+                'link': {'reverse': False, 'url': self.get_export_url(fmt)}},
+            self.get_export_formats())))
+
+    def get_export_url(self, fmt):
+        qd = self.request.GET.copy()
+        for key in ['page', 'cursor', '_fragment', 'export']:
+            qd.pop(key, None)
+        qd['export'] = fmt
+        return '?'.join([self.request.path, qd.urlencode()])
 
     def change_list_view(self, op, value=None):
         if self.stateful and op == 'display':
@@ -240,7 +663,7 @@ class CollectionView(ListView):
     def redirection(self):
         if self.stateful:
             default_state = self.get_default_state()
-            if not self.model.objects.count():
+            if not self.model.objects.exists():
                 return self.navigate('-'.join([
                     get_string(get_model_names(self.model)[0]),
                     'add']))
@@ -260,23 +683,168 @@ class CollectionView(ListView):
                     return redirect('?'.join([self.request.path, urlencode(kw)]))
             self.define_state()
 
+    def get_bulk_actions(self):
+        return list(map(
+            lambda action: action if not action == 'delete' else {
+                'name': 'delete',
+                'delete': True,
+                'icon': 'trash',
+                'title': _('Delete'),
+                'level': 'danger'},
+            self.bulk_actions))
+
+    def get_bulk_action(self, name):
+        return first(list(filter(
+            lambda action: action['name'] == name,
+            self.get_bulk_actions())) or [None])
+
+    def iter_pk_chunks(self, qs):
+        pks = qs.order_by('pk').values_list('pk', flat=True)
+        chunk = list(pks[:self.bulk_chunk_size])
+        while chunk:
+            yield chunk
+            chunk = len(chunk) == self.bulk_chunk_size \
+                and list(pks.filter(pk__gt=chunk[-1])[:self.bulk_chunk_size]) or []
+
+    def apply_bulk_action(self, action, qs, chunk):
+        if 'update' in action:
+            return qs.update(**action['update'])
+        elif action.get('delete'):
+            qs.delete()
+            return len(chunk)
+        fn = action['callable']
+        return (getattr(self, fn) if isinstance(fn, str) else fn)(qs) or len(chunk)
+
+    def apply_bulk_chunk(self, action, chunk, using):
+        count = self.apply_bulk_action(
+            action,
+            self.model._default_manager.db_manager(using).filter(pk__in=chunk),
+            chunk)
+        search.reindex(self.model, chunk, using)
+        return count
+
+    def run_bulk_action(self, action, qs):
+        with transaction.atomic(using=qs.db):
+            count = sum(map(
+                lambda chunk: self.apply_bulk_chunk(action, chunk, qs.db),
+                self.iter_pk_chunks(qs)))
+        touch_model(self.model, qs.db)
+        return count
+
+    def post(self, request, *args, **kw):
+        action = self.get_bulk_action(request.POST.get('bulk'))
+        if action is None:
+            return self.reload()
+        if self.stateful:
+            self.define_state()
+        qs = self.get_queryset()
+        if not request.POST.get('all'):
+            qs = qs.filter(pk__in=request.POST.getlist('pk'))
+        self.send_message('success', _('%(count)s objects were processed') % {
+            'count': self.run_bulk_action(action, qs)})
+        return self.reload()
+
     def get(self, request, *args, **kw):
-        return self.redirection or super().get(request, *args, **kw)
+        if self.fragment:
+            self.streaming = False
+        return self.redirection or self.export_response() or super().get(request, *args, **kw)
+
+    def get_related_models(self):
+        models = [self.model]
+        for column in map(get_string, self.columns):
+            model = self.model
+            for name in column.split('__'):
+                try:
+                    field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    break
+                if not field.is_relation:
+                    break
+                model = field.related_model
+                models.append(model)
+        return models
+
+    def get_fingerprint(self):
+        models = self.get_related_models()
+        if not check_watched(*models):
+            return None
+        return [get_versions(*models), self.fragment]
+
+    def patch_validators(self, response):
+        patch_vary_headers(response, ['X-Requested-With'])
+        return super().patch_validators(response)
+
+    @cached_property
+    def fragment(self):
+        if '_fragment' in self.request.GET:
+            return self.request.GET['_fragment'] or 'html'
+        return self.request.is_ajax() and 'html' or None
+
+    def render_fragment(self, context):
+        return engines['django'].from_string(
+            '{% load library %}{% content %}').render(context, request=self.request)
+
+    def get_fragment_page(self, page):
+        return page and {
+            'number': page.number,
+            'has_next': page.has_next(),
+            'has_previous': page.has_previous(),
+            'next_cursor': getattr(page, 'next_cursor', None),
+            'previous_cursor': getattr(page, 'previous_cursor', None)}
+
+    def get_fragment_data(self, context):
+        return {
+            'guide': list(map(lambda c: list(map(export.format_cell, c)), context.get('guide', []))),
+            'objects': list(map(
+                lambda obj: map_values(export.format_cell, obj),
+                context['objects'])),
+            'filters': list(map(
+                lambda f: dict(f, title=str(f['title']), choices=list(map(
+                    lambda choice: list(map(export.format_cell, choice)),
+                    f.get('choices', [])))),
+                context.get('filters', []))),
+            'page': self.get_fragment_page(context['page_obj'])}
+
+    def render_to_response(self, context, **kw):
+        if self.fragment == 'json':
+            response = JsonResponse(self.get_fragment_data(context))
+        elif self.fragment:
+            response = HttpResponse(self.render_fragment(context))
+        else:
+            response = super().render_to_response(context, **kw)
+        patch_vary_headers(response, ['X-Requested-With'])
+        return response
+
+    def plan_display(self, column):
+        return dict(super().plan_display(column), sortable=(
+            column in self.get_list_view('sort') and self.map_attr(column)))
 
     def get_guide(self):
         return list(map(
-            lambda name: [
-                self.get_column_key(name),
-                self.display_column(self.get_model_field(name)),
-                name in self.get_list_view('sort') and self.map_attr(name)],
-            self.columns))
+            lambda c: [c['key'], c['title'], c['sortable']],
+            self.get_column_plan()))
+
+    def get_state_data(self, filters):
+        return {
+            'guide': self.get_guide(),
+            'filters': filters,
+            'actions': self.get_actions(),
+            'bulk': list(map(
+                lambda action: dict(
+                    pick(action, 'icon', 'title', 'level', 'onclick'),
+                    attrs={'name': 'bulk', 'value': action['name']}),
+                self.get_bulk_actions())),
+            'search': bool(len(self.get_list_view('search')))}
 
     def get_context_data(self, **kw):
+        pending = self.stateful and self.parallel and not self.streaming \
+            and self.submit_filters()
         data = super().get_context_data(**kw)
-        if self.stateful:
-            data.update({
-                'guide': self.get_guide(),
-                'filters': self.get_filters(),
-                'actions': self.get_actions(),
-                'search': bool(len(self.get_list_view('search')))})
-        return dict(data, objects=self.display_objects(data['object_list']))
+        objects = (self.iter_objects if self.streaming else self.display_objects)(
+            data['object_list'])
+        if pending:
+            data.update(self.get_state_data(pending()))
+        elif self.stateful:
+            data.update(self.get_state_data(
+                defer(self.get_filters) if self.streaming else self.get_filters()))
+        return dict(data, objects=objects)